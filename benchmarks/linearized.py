@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Compares plain PDFs (as written by reportlab) with linearized ones.
+#
+# Renders a large job once, then linearizes copies of it, with and without
+# object streams. For each variant it reports the file size, the time the
+# post-processing took and the time to first page: how long a viewer has to
+# download (at --mbit) before it can show page one. For plain files that is
+# the whole file, as the cross-reference table is at the very end. For
+# linearized files it is everything up to the end of the first page (/E in
+# the linearization dictionary).
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.eseries import resistors  # noqa: E402
+from src.linearize import linearize  # noqa: E402
+from src.main import create_canvas, register_fonts, render_stickers  # noqa: E402
+from src.paperconfig import LAYOUTS  # noqa: E402
+
+def first_page_bytes(filename: str) -> int:
+    with open(filename, "rb") as f:
+        head = f.read(4096)
+
+    match = re.search(rb"/Linearized.*?/E (\d+)", head, re.DOTALL)
+    if match is None:
+        return os.path.getsize(filename)
+    return int(match.group(1))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare plain and linearized PDF output")
+    parser.add_argument("--labels", type=int, default=10000, help="number of labels in the job")
+    parser.add_argument("--layout", default="VYSOCINA", choices=list(LAYOUTS), help="paper layout")
+    parser.add_argument("--mbit", type=float, default=50, help="assumed download speed in Mbit/s")
+    args = parser.parse_args()
+
+    # The font is looked up relative to the repository
+    os.chdir(REPO_ROOT)
+    register_fonts()
+
+    layout = LAYOUTS[args.layout]
+    values = list(resistors("E96", 1, 1e7))
+    values = (values * (args.labels // len(values) + 1))[:args.labels]
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "plain.pdf")
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            c = create_canvas(plain, layout)
+            summary = render_stickers(c, layout, values, False, True)
+            c.save()
+        render_seconds = time.perf_counter() - start
+
+        print(f"{summary.stickers} stickers on {summary.pages} pages, rendered in {render_seconds:.2f} s")
+        print(f"{'variant':<28} {'size [kB]':>10} {'extra [s]':>10} {'first page [kB]':>16} {'first page [s]':>15}")
+
+        variants = [("plain", None), ("linearized", False), ("linearized + object streams", True)]
+        for (name, object_streams) in variants:
+            filename = plain
+            extra = 0.0
+
+            if object_streams is not None:
+                filename = os.path.join(directory, name.replace(" ", "") + ".pdf")
+                shutil.copyfile(plain, filename)
+
+                start = time.perf_counter()
+                linearize(filename, object_streams)
+                extra = time.perf_counter() - start
+
+            size = os.path.getsize(filename)
+            needed = first_page_bytes(filename)
+            seconds = needed * 8 / (args.mbit * 1e6)
+
+            print(f"{name:<28} {size / 1000:>10.1f} {extra:>10.2f} {needed / 1000:>16.1f} {seconds:>15.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Compares the output profiles (see src/outputprofile.py): the time it takes
+# to render and save a job with each of them, and the size of the PDF, both
+# per 1000 labels. Every profile is run a few times and the fastest run
+# counts, so that a busy machine does not skew the comparison.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.main import create_canvas, register_fonts, render_stickers  # noqa: E402
+from src.outputprofile import PROFILES  # noqa: E402
+from src.paperconfig import LAYOUTS  # noqa: E402
+from src.synthetic import synthetic_catalogue  # noqa: E402
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the time and size of the output profiles")
+    parser.add_argument("--labels", type=int, default=2000, help="number of labels in the job")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per profile, the fastest one counts")
+    parser.add_argument("--layouts", nargs="+", default=["VYSOCINA", "AVERY_5260"], choices=list(LAYOUTS),
+                        help="paper layouts")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the synthetic catalogue")
+    args = parser.parse_args()
+
+    # The font is looked up relative to the repository
+    os.chdir(REPO_ROOT)
+    register_fonts()
+
+    values = list(synthetic_catalogue(args.labels, args.seed))
+    per_thousand = 1000 / args.labels
+
+    print(f"{args.labels} labels, best of {args.repeat} runs, per 1000 labels")
+    print(f"{'layout':<12} {'profile':<10} {'time [s]':>10} {'size [kB]':>10} {'size':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "profile.pdf")
+
+        for name in args.layouts:
+            layout = LAYOUTS[name]
+            default_size = None
+
+            for profile in PROFILES:
+                seconds = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        c = create_canvas(filename, layout, profile=profile)
+                        render_stickers(c, layout, values, False, True)
+                        c.save()
+                    seconds = min(seconds, time.perf_counter() - start)
+
+                size = os.path.getsize(filename)
+                if default_size is None:
+                    default_size = size
+
+                print(f"{name:<12} {profile:<10} {seconds * per_thousand:>10.3f} "
+                      f"{size * per_thousand / 1000:>10.1f} {size / default_size:>8.0%}")
+
+if __name__ == "__main__":
+    main()
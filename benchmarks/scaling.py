@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# Measures how rendering scales with the size of the job.
+#
+# Renders synthetic jobs (see src/synthetic.py) of the given sizes, each in a
+# fresh process, and reports the throughput, the peak memory (RSS) and the
+# output size per label. The jobs are streamed into the renderer, so the
+# component list itself never has to be held in memory. Note that a million
+# labels take a good while to render.
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+def peak_rss_bytes() -> Optional[int]:
+    # The resource module does not exist on Windows, and ru_maxrss comes in
+    # bytes on macOS but in kilobytes on Linux
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def run_single(labels: int, seed: int, layout_name: str) -> Dict[str, Any]:
+    from src.main import create_canvas, register_fonts, render_stickers
+    from src.paperconfig import LAYOUTS
+    from src.synthetic import synthetic_catalogue
+
+    # The font is looked up relative to the repository
+    os.chdir(REPO_ROOT)
+    register_fonts()
+    layout = LAYOUTS[layout_name]
+
+    start = time.perf_counter()
+    generated = sum(1 for _ in synthetic_catalogue(labels, seed))
+    generate_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "scaling.pdf")
+
+        start = time.perf_counter()
+        # Into the void rather than into a buffer, which would hold one line
+        # for every label and inflate the very memory figure measured here
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            c = create_canvas(filename, layout)
+            summary = render_stickers(c, layout, synthetic_catalogue(labels, seed), False, True)
+            c.save()
+        render_seconds = time.perf_counter() - start
+
+        size = os.path.getsize(filename)
+
+    return {
+        "labels": generated,
+        "stickers": summary.stickers,
+        "pages": summary.pages,
+        "generate_seconds": generate_seconds,
+        "render_seconds": render_seconds,
+        "bytes": size,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure throughput, memory and output size at several job sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="job sizes in labels")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic jobs")
+    parser.add_argument("--layout", default="VYSOCINA", help="paper layout, see LAYOUTS in src/paperconfig.py")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args.single, args.seed, args.layout)))
+        return
+
+    print(f"{'labels':>9} {'pages':>7} {'gen [s]':>8} {'render [s]':>11} {'labels/s':>9} "
+          f"{'peak RSS [MB]':>14} {'bytes/label':>12}")
+
+    for size in args.sizes:
+        # A separate process for every size, so that the peak memory of one
+        # run does not carry over into the next
+        output = subprocess.run(
+            [sys.executable, __file__, "--single", str(size), "--seed", str(args.seed), "--layout", args.layout],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output)
+        peak = "n/a" if result["peak_rss_bytes"] is None else "{:.1f}".format(result["peak_rss_bytes"] / 2**20)
+
+        print(f"{result['labels']:>9} {result['pages']:>7} {result['generate_seconds']:>8.2f} "
+              f"{result['render_seconds']:>11.2f} {result['stickers'] / result['render_seconds']:>9.0f} "
+              f"{peak:>14} {result['bytes'] / max(1, result['stickers']):>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Tracks the interpreter/import startup cost of LabelGenerator.py.
+#
+# Runs `python -X importtime -c "import LabelGenerator"` a couple of times,
+# and reports the median cumulative import time of the heaviest modules.
+# Pass --save to store the result as a baseline, later runs then print the
+# difference against it.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "startup_baseline.json"
+
+def run_importtime() -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import LabelGenerator"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    cumulative: Dict[str, int] = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+
+        cumulative[fields[2].strip()] = int(fields[1])
+
+    return cumulative
+
+def run_wall_time() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import LabelGenerator"], cwd=REPO_ROOT, check=True)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the import startup time of LabelGenerator.py")
+    parser.add_argument("--runs", type=int, default=5, help="number of measured runs")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to list")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    samples: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        for module, us in run_importtime().items():
+            samples.setdefault(module, []).append(us)
+
+    medians = {module: int(statistics.median(values)) for module, values in samples.items()}
+    wall = statistics.median(run_wall_time() for _ in range(args.runs))
+
+    baseline: Dict[str, int] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    print(f"Wall time of 'import LabelGenerator': {wall * 1000:.1f} ms")
+    print(f"{'cumulative [us]':>16} {'baseline [us]':>14}  module")
+
+    for module, us in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        previous = str(baseline[module]) if module in baseline else "-"
+        print(f"{us:>16} {previous:>14}  {module}")
+
+    if args.save:
+        args.baseline.write_text(json.dumps(medians, indent=4, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Compares rendering split output serially, with a thread pool and with a
+# process pool.
+#
+# The job is split into parts of --pages pages, as with max_pages_per_file,
+# and every part is rendered into its own file. Serially, one part after the
+# other on the main thread. The thread pool renders the parts side by side,
+# each thread with its own canvas and font; the process pool has to send
+# every part's components to a worker first. Threads only run in parallel on
+# free-threaded Python (3.13t and later), with the GIL they take turns.
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import sysconfig
+import tempfile
+import time
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.main import register_fonts  # noqa: E402
+from src.outputplan import plan_output, render_part, render_plan  # noqa: E402
+from src.paperconfig import LAYOUTS  # noqa: E402
+from src.synthetic import synthetic_catalogue  # noqa: E402
+
+def gil_enabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare serial, threaded and multi-process rendering")
+    parser.add_argument("--labels", type=int, default=20000, help="number of labels in the job")
+    parser.add_argument("--pages", type=int, default=20, help="pages per part")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="threads and processes")
+    parser.add_argument("--layout", default="VYSOCINA", choices=list(LAYOUTS), help="paper layout")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the synthetic catalogue")
+    args = parser.parse_args()
+
+    # The font is looked up relative to the repository
+    os.chdir(REPO_ROOT)
+    register_fonts()
+
+    layout = LAYOUTS[args.layout]
+    values = list(synthetic_catalogue(args.labels, args.seed))
+
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"Python {sys.version.split()[0]}, free-threaded build: {free_threaded}, GIL enabled: {gil_enabled()}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        parts = plan_output(values, layout, os.path.join(directory, "part"), max_pages=args.pages)
+        manifest = os.path.join(directory, "parts.json")
+        print(f"{args.labels} labels in {len(parts)} parts, {args.workers} workers")
+        print(f"{'mode':<10} {'time [s]':>10} {'labels/s':>10} {'speedup':>10}")
+
+        timings = []
+        for mode in ("serial", "threads", "processes"):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if mode == "serial":
+                    for part in parts:
+                        render_part(part, layout, False, True)
+                else:
+                    render_plan(parts, layout, False, True, manifest, jobs=args.workers,
+                                threads=mode == "threads")
+            seconds = time.perf_counter() - start
+
+            timings.append(seconds)
+            print(f"{mode:<10} {seconds:>10.2f} {args.labels / seconds:>10.0f} {timings[0] / seconds:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from src.statecanvas import CanvasMark, StateTrackingCanvas
+
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.pdfgen.pathobject import PDFPathObject
+
+class _BatchMark(CanvasMark):
+    # Segments collected before the mark may still be pending, in the same
+    # path as those drawn after it. The path object itself stays intact when
+    # it gets stroked, so it can be cut back and put back in place.
+    def __init__(self, c: BatchingCanvas) -> None:
+        super().__init__(c._c)
+        self._batching = c
+        self._path = c._path
+        self._path_length = len(c._path._code) if c._path is not None else 0
+
+    def rollback(self) -> None:
+        super().rollback()
+        if self._path is not None:
+            del self._path._code[self._path_length:]
+        self._batching._path = self._path
+
+class BatchingCanvas(StateTrackingCanvas):
+    # Collects consecutive stroked line segments, arcs and circle outlines into
+    # a single path, which is stroked at once as soon as anything else gets
+    # drawn or the graphics state actually changes.
+    #
+    # Every segment starts its own subpath, so line caps and joins look exactly
+    # the same as when the segments are stroked one by one.
+
+    def __init__(self, c: Canvas) -> None:
+        super().__init__(c)
+        self._path: PDFPathObject | None = None
+
+        self.batched_operations = 0
+        self.stroked_paths = 0
+
+    @property
+    def canvas(self) -> Canvas:
+        self.flush()
+        return self._c
+
+    def mark(self) -> CanvasMark:
+        return _BatchMark(self)
+
+    def _before_state_change(self) -> None:
+        self.flush()
+
+    def _begin(self) -> PDFPathObject:
+        if self._path is None:
+            self._path = self._c.beginPath()
+
+        self.batched_operations += 1
+        return self._path
+
+    def flush(self) -> None:
+        if self._path is not None:
+            self._c.drawPath(self._path, stroke=1, fill=0)
+            self._path = None
+            self.stroked_paths += 1
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        path = self._begin()
+        path.moveTo(x1, y1)
+        path.lineTo(x2, y2)
+
+    def arc(self, x1: float, y1: float, x2: float, y2: float, startAng: float = 0, extent: float = 90) -> None:
+        self._begin().arc(x1, y1, x2, y2, startAng, extent)
+
+    def circle(self, x_cen: float, y_cen: float, r: float, stroke: int = 1, fill: int = 0) -> None:
+        if stroke and not fill:
+            self._begin().circle(x_cen, y_cen, r)
+        else:
+            self.flush()
+            self._c.circle(x_cen, y_cen, r, stroke, fill)
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything not handled above has to see the strokes collected so far
+        self.flush()
+        return getattr(self._c, name)
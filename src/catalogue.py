@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from src.components.registry import COMPONENT_CLASSES, get_type_name
+from src.parameters import Quantity, parse_quantity
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Bounds of a query condition: numbers in the base unit, or strings with units
+# ("6 mm"). None leaves that side of the range open.
+Bound = Optional[Union[float, str]]
+
+# Tolerance for comparing bounds, so that "6 mm" matches a parsed 6 mm exactly
+_EPSILON = 1e-12
+
+def _to_number(bound: Bound, default: float) -> float:
+    if bound is None:
+        return default
+
+    if isinstance(bound, str):
+        quantity = parse_quantity(bound)
+        if quantity is None:
+            raise ValueError(f"Cannot parse '{bound}'")
+        return quantity.low
+
+    return float(bound)
+
+class _ParameterIndex:
+    # Positions of the components sorted by the lower and by the upper end of
+    # the parameter's value, so that range queries are just two bisections
+    def __init__(self, entries: List[Tuple[Quantity, int]]) -> None:
+        by_low = sorted((quantity.low, position) for (quantity, position) in entries)
+        by_high = sorted((quantity.high, position) for (quantity, position) in entries)
+
+        self.lows = [low for (low, _) in by_low]
+        self.low_positions = [position for (_, position) in by_low]
+        self.highs = [high for (high, _) in by_high]
+        self.high_positions = [position for (_, position) in by_high]
+
+    def select(self, minimum: float, maximum: float) -> Iterable[int]:
+        # Components whose whole value range lies within [minimum, maximum]
+        minimum -= abs(minimum) * _EPSILON
+        maximum += abs(maximum) * _EPSILON
+
+        start = bisect_left(self.lows, minimum)
+        end = bisect_right(self.highs, maximum)
+
+        # Walk the smaller side and check the other bound against that set
+        if len(self.lows) - start <= end:
+            allowed = set(self.high_positions[:end])
+            return (p for p in self.low_positions[start:] if p in allowed)
+
+        allowed = set(self.low_positions[start:])
+        return (p for p in self.high_positions[:end] if p in allowed)
+
+class Catalogue:
+    # An in-memory catalogue of components, indexed by type and by the numeric
+    # values of their parameters.
+    #
+    #   catalogue.query("screw", thread=("3 mm", "3 mm"), l=("6 mm", "16 mm"))
+    #   catalogue.query("NPNBJT", ic=("500 mA", None))
+    def __init__(self, components: Iterable[Component | None]) -> None:
+        self.components: List[Component] = [c for c in components if c is not None]
+
+        self._by_name: Dict[str, List[int]] = {}
+        entries: Dict[Tuple[str, str], List[Tuple[Quantity, int]]] = {}
+
+        for (position, component) in enumerate(self.components):
+            type_name = get_type_name(component)
+            self._by_name.setdefault(type_name, []).append(position)
+
+            for cls in type(component).__mro__:
+                if cls.__name__ in COMPONENT_CLASSES:
+                    if cls.__name__ != type_name:
+                        self._by_name.setdefault(cls.__name__, []).append(position)
+                    break
+
+            for (param, quantity) in component.params.items():
+                if quantity is not None:
+                    entries.setdefault((type_name, param), []).append((quantity, position))
+
+        self._indexes = {key: _ParameterIndex(value) for (key, value) in entries.items()}
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def query(
+        self,
+        name: str,
+        sort_by: str | None = None,
+        **conditions: Tuple[Bound, Bound],
+    ) -> List[Component]:
+        # `name` is a type name ("screw") or class name ("RoundHeadScrew")
+        if name not in self._by_name:
+            return []
+
+        positions = self._by_name[name]
+        type_name = get_type_name(self.components[positions[0]])
+
+        selected: Set[int] | None = None
+        if name != type_name:
+            selected = set(positions)
+
+        for (param, (minimum, maximum)) in conditions.items():
+            index = self._indexes.get((type_name, param))
+            if index is None:
+                return []
+
+            matches = index.select(_to_number(minimum, float("-inf")), _to_number(maximum, float("inf")))
+            selected = set(matches) if selected is None else selected.intersection(matches)
+
+        result = sorted(selected) if selected is not None else list(positions)
+        components = [self.components[p] for p in result]
+
+        if sort_by is not None:
+            components.sort(key=lambda c: _sort_key(c, sort_by))
+
+        return components
+
+def _sort_key(component: Component, param: str) -> Tuple[bool, float]:
+    # Components without a known value go last
+    quantity = component.params.get(param)
+    if quantity is None:
+        return (True, 0.0)
+    return (False, quantity.low)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from src.main import RenderSummary, StickerFailure, create_canvas, register_fonts, render_stickers
+from src.outputprofile import DEFAULT_PROFILE
+from src.paperconfig import PaperConfig
+
+from typing import Any, Dict, List, Sequence, TYPE_CHECKING
+
+import json
+import os
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Long jobs are rendered as a series of segment files, each ending at a page
+# boundary. The finished segments are noted in a checkpoint file next to the
+# output, so that a job which got interrupted (or crashed) continues after the
+# last finished segment when it is run again. At the end, the segments are
+# joined into the output file.
+
+def segment_filename(output_file: str, number: int) -> str:
+    return "{}.part{:04}.pdf".format(os.path.splitext(output_file)[0], number)
+
+def checkpoint_filename(output_file: str) -> str:
+    return output_file + ".checkpoint.json"
+
+def _load_checkpoint(filename: str, digest: str) -> List[Dict[str, Any]]:
+    # The finished segments, if the checkpoint belongs to the same job
+    try:
+        with open(filename, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return []
+
+    if checkpoint.get("job") != digest:
+        return []
+
+    segments: List[Dict[str, Any]] = checkpoint["segments"]
+    return segments
+
+def _save_checkpoint(filename: str, digest: str, segments: List[Dict[str, Any]]) -> None:
+    # Replaced in one go, so that an interruption never leaves a broken file
+    with open(filename + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"job": digest, "segments": segments}, f, indent=4)
+        f.write("\n")
+    os.replace(filename + ".tmp", filename)
+
+def _import_pikepdf() -> Any:
+    # reportlab cannot read PDFs, so joining the segments needs the optional
+    # pikepdf library
+    try:
+        import pikepdf
+    except ImportError:
+        raise RuntimeError("Checkpointed output needs pikepdf, install it with 'pip install pikepdf'") from None
+
+    return pikepdf
+
+def join_segments(filenames: Sequence[str], output_file: str, reproducible: bool = False) -> None:
+    pikepdf = _import_pikepdf()
+
+    segments = [pikepdf.open(filename) for filename in filenames]
+    try:
+        with pikepdf.new() as pdf:
+            for segment in segments:
+                pdf.pages.extend(segment.pages)
+
+            # The title and creator of the first segment are those of the job
+            pdf.trailer.Info = pdf.copy_foreign(segments[0].trailer.Info)
+            pdf.save(output_file + ".tmp", deterministic_id=reproducible)
+    finally:
+        for segment in segments:
+            segment.close()
+
+    os.replace(output_file + ".tmp", output_file)
+
+def render_checkpointed(
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    output_file: str,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    pages_per_segment: int = 50,
+    reproducible: bool = False,
+    draw_codes: bool = False,
+    profile: str = DEFAULT_PROFILE,
+) -> RenderSummary:
+    from src.jobcache import job_hash
+
+    # Rather find out now than after rendering every segment
+    _import_pikepdf()
+
+    # Any change to the job makes the old segments useless
+    digest = job_hash(layout, values, draw_outlines=draw_outlines, draw_center_line=draw_center_line,
+                      draw_codes=draw_codes, profile=profile, pages_per_segment=pages_per_segment)
+
+    checkpoint_file = checkpoint_filename(output_file)
+    done = _load_checkpoint(checkpoint_file, digest)
+
+    per_page = layout.num_stickers_horizontal * layout.num_stickers_vertical
+    per_segment = pages_per_segment * per_page
+    filenames: List[str] = []
+    summary = RenderSummary()
+
+    register_fonts()
+
+    for (number, start) in enumerate(range(0, max(len(values), 1), per_segment)):
+        filename = segment_filename(output_file, number + 1)
+        filenames.append(filename)
+
+        if number < len(done) and os.path.exists(filename):
+            entry = done[number]
+        else:
+            c = create_canvas(filename, layout, reproducible, profile)
+            part = render_stickers(c, layout, values[start:start + per_segment],
+                                   draw_outlines, draw_center_line, draw_codes=draw_codes)
+            c.save()
+
+            entry = {
+                "filename": filename,
+                "pages": part.pages,
+                "stickers": part.stickers,
+                "elided_state_changes": part.elided_state_changes,
+                "failures": [failure.to_dict() for failure in part.failures],
+            }
+            for failure in entry["failures"]:
+                failure["position"] += start
+                failure["page"] += number * pages_per_segment
+
+            # Everything after an interruption gets rendered again
+            done = done[:number] + [entry]
+            _save_checkpoint(checkpoint_file, digest, done)
+
+        part = RenderSummary()
+        part.pages = entry["pages"]
+        part.stickers = entry["stickers"]
+        part.elided_state_changes = entry["elided_state_changes"]
+        part.failures = [StickerFailure(**failure) for failure in entry["failures"]]
+        summary.add(part)
+
+    join_segments(filenames, output_file, reproducible)
+
+    for filename in filenames:
+        os.remove(filename)
+    os.remove(checkpoint_file)
+
+    return summary
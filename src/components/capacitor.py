@@ -1,12 +1,22 @@
+from __future__ import annotations
+
 from src.stickerrect import StickerRect
-from src.components.component import Component
+from src.components.component import Component, TEXT_COLUMN_WIDTH
+from src.palette import COLORCODE_LIGHT, COLORCODE_DARK
+from src.textfit import fit_font_size
+from src.parameters import exact
+from src.rendercontext import DEFAULT_CONTEXT, RenderContext
 
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.lib.colors import black, toColor
+from reportlab.lib.colors import black
 from reportlab.lib.units import inch
 
 import math
 
+from typing import Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
 class Capacitor(Component):
     def __init__(self, farads: float):
         self.units = "F"
@@ -25,6 +35,8 @@ class Capacitor(Component):
 
         self.val = val
         self.exp = exp
+        self._texts: Tuple[str, ...] | None = None
+        self.params = {"c": exact(farads, "F")}
 
     def get_3digit_code(self) -> str:
         if self.val % 10 != 0:
@@ -82,7 +94,19 @@ class Capacitor(Component):
         c.line(x - size / 4, y - size, x - size / 4, y + size)
         c.line(x + size / 4, y - size, x + size / 4, y + size)
 
-    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool) -> None:
+    def prepare(self) -> None:
+        self._texts = (self.format_value(), self.get_3digit_code(), self.get_eia198_code())
+
+    def get_texts(self) -> Tuple[str, ...]:
+        # The value and codes do not depend on the layout, so they are only
+        # computed once, no matter how many times the sticker gets drawn
+        if self._texts is None:
+            self.prepare()
+            assert self._texts is not None
+        return self._texts
+
+    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool,
+             ctx: RenderContext = DEFAULT_CONTEXT) -> None:
         # Draw middle line
         if draw_center_line:
             c.setStrokeColor(black, 0.25)
@@ -93,32 +117,31 @@ class Capacitor(Component):
                    rect.bottom + rect.height/2)
 
         # Draw resistor value
-        print("Generating sticker '{}'".format(self.format_value()))
+        (value_string, code3, eia198) = self.get_texts()
+        print("Generating sticker '{}'".format(value_string))
 
-        value_font_size = 0.25 * inch
+        value_font_size = fit_font_size(value_string, ctx.font, 0.25 * inch, rect.width * TEXT_COLUMN_WIDTH)
         smd_font_size = 0.08 * inch
 
-        value_string = self.format_value()
-
         text_middle = rect.left + rect.width/2
         text_bottom = rect.bottom + rect.height/4 - value_font_size/5
-        c.setFont('main', value_font_size * 1)
+        c.setFont(ctx.font, value_font_size * 1)
         c.drawCentredString(text_middle, text_bottom, value_string)
         c.drawCentredString(text_middle, text_bottom+rect.height/2, value_string)
 
         for bottom in (rect.bottom+rect.height/16, rect.bottom+rect.height*8/16):
             self.draw_colorcode(c,
-                toColor("hsl(55, 54%, 100%)"), toColor("hsl(55, 54%, 70%)"),
+                COLORCODE_LIGHT, COLORCODE_DARK,
                 rect.left,
                 bottom,
                 rect.width/3, rect.height*7/16,
-                3, 12)
+                3, 12, ctx)
 
-        c.setFont('main', smd_font_size * 1.35)
+        c.setFont(ctx.font, smd_font_size * 1.35)
         for i in (0,rect.height/2):
             c.drawString(rect.left + rect.width / 3, rect.bottom +
-                rect.height / 13 + i, self.get_3digit_code())
+                rect.height / 13 + i, code3)
             c.drawRightString(rect.left + rect.width * 2 / 3, rect.bottom +
-                rect.height / 13 + i, self.get_eia198_code())
+                rect.height / 13 + i, eia198)
             self.draw_capacitor(c, rect, rect.left + 5 * rect.width / 6, rect.bottom + rect.height/4 + i)
 
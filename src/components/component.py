@@ -1,12 +1,23 @@
+from __future__ import annotations
+
 from src.stickerrect import StickerRect
+from src.textfit import fit_font_size, fit_common_font_size
+from src.parameters import Quantity
+from src.rendercontext import DEFAULT_CONTEXT, RenderContext
 
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.lib.colors import Color, black, HexColor, gray
+from reportlab.lib.colors import Color, black, gray
 from reportlab.lib.units import inch
 
-from typing import List
+from typing import Dict, Sequence, TYPE_CHECKING
 from math import pow, sin, cos, pi
 
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+# The texts are laid out in columns a third of the sticker wide. Texts wider
+# than this (minus a bit of spacing) get shrunk to fit.
+TEXT_COLUMN_WIDTH = 0.32
+
 class Component:
     def __init__(self):
         self.exp = 0
@@ -17,12 +28,20 @@ class Component:
         self.str3 = ""
         self.type = ""
         self.units = ""
+        # Numeric values of the parameters, for sorting and selecting components
+        self.params: Dict[str, Quantity | None] = {}
         raise Exception("called parent class")
     
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         raise Exception("called parent class")
 
-    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool) -> None:
+    def prepare(self) -> None:
+        # Computes everything which does not depend on the layout up front, so
+        # that it is shared when the component gets drawn onto several layouts
+        pass
+
+    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool,
+             ctx: RenderContext = DEFAULT_CONTEXT) -> None:
         raise Exception("called parent class")
 
     def get_prefix(self) -> str:
@@ -45,19 +64,8 @@ class Component:
 
         return "p"
 
-    def color_table(self, num: int) -> Color:
-        return [
-            HexColor("#000000"),
-            HexColor("#964B00"),
-            HexColor("#FF3030"),
-            HexColor("#FFA500"),
-            HexColor("#FFFF00"),
-            HexColor("#00FF00"),
-            HexColor("#0000FF"),
-            HexColor("#C520F6"),
-            HexColor("#808080"),
-            HexColor("#FFFFFF"),
-        ][num]
+    def color_table(self, num: int, ctx: RenderContext = DEFAULT_CONTEXT) -> Color:
+        return ctx.get_palette().band(num)
 
     def draw_arrow(self, c: Canvas, x: float, y: float, l: float, wl: float, a: float) -> None:
         cx = x + l * cos(a)
@@ -76,7 +84,7 @@ class Component:
         y: float,
         width: float,
         height: float,
-        color_table: List[Color]
+        color_table: Sequence[Color]
     ) -> None:
         c.setFillColor(color_table[2])
         c.rect(x, y+height*5/6, width, height/6, fill=1, stroke=0)
@@ -97,33 +105,28 @@ class Component:
         c.setStrokeColorRGB(0.2, 0.2, 0.2, 0.5)
         c.rect(x, y, width, height, fill=0, stroke=1)
 
-    def draw_stripe(self, c: Canvas, x: float, y: float, width: float, height: float, stripe_value: int) -> None:
+    def draw_stripe(
+        self,
+        c: Canvas,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        stripe_value: int,
+        ctx: RenderContext = DEFAULT_CONTEXT
+    ) -> None:
         if 0 <= stripe_value <= 9:
-            c.setFillColor(self.color_table(stripe_value))
+            c.setFillColor(self.color_table(stripe_value, ctx))
             c.rect(x, y, width, height, fill=1, stroke=0)
             self.draw_stripe_border(c, x, y, width, height)
             return
 
         elif stripe_value == -1:
-            gold_table = [
-                HexColor("#FFF0A0"),
-                HexColor("#FFE55C"),
-                HexColor("#FFD700"),
-                HexColor("#D1B000"),
-            ]
-
-            self.draw_fancy_stripe(c, x, y, width, height, gold_table)
+            self.draw_fancy_stripe(c, x, y, width, height, ctx.get_palette().gold)
             self.draw_stripe_border(c, x, y, width, height)
             return
         elif stripe_value == -2:
-            silver_table = [
-                HexColor("#D0D0D0"),
-                HexColor("#A9A9A9"),
-                HexColor("#929292"),
-                HexColor("#7B7B7B"),
-            ]
-
-            self.draw_fancy_stripe(c, x, y, width, height, silver_table)
+            self.draw_fancy_stripe(c, x, y, width, height, ctx.get_palette().silver)
             self.draw_stripe_border(c, x, y, width, height)
             return
         else:
@@ -145,7 +148,8 @@ class Component:
             width: float,
             height: float,
             num_codes: int,
-            exp_shift: int = 0
+            exp_shift: int = 0,
+            ctx: RenderContext = DEFAULT_CONTEXT
     ) -> None:
         exp=self.exp + exp_shift
 
@@ -159,7 +163,8 @@ class Component:
                                  y + border,
                                  stripe_width,
                                  height - 2 * border,
-                                 0)
+                                 0,
+                                 ctx)
         else:
             for i in range(num_codes):
                 if i == num_codes - 1:
@@ -175,7 +180,8 @@ class Component:
                                      y + border,
                                      stripe_width,
                                      height - 2 * border,
-                                     stripe_value)
+                                     stripe_value,
+                                     ctx)
 
         c.setFillColor(black)
         c.setStrokeColor(black, 1)
@@ -200,8 +206,16 @@ class Component:
     def format_value(self) -> str:
         return self.get_prefixed_number() + " " + self.get_prefix() + self.units
 
+    def get_identity(self) -> str:
+        # Tells this part apart from the others of its type, e.g. in barcodes
+        return self.format_value()
+
 class BasicComponent(Component):
-    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool) -> None:
+    def get_identity(self) -> str:
+        return self.value
+
+    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool,
+             ctx: RenderContext = DEFAULT_CONTEXT) -> None:
         # Draw middle line
         if draw_center_line:
             c.setStrokeColor(black, 0.25)
@@ -214,12 +228,14 @@ class BasicComponent(Component):
         # Draw resistor value
         print("Generating sticker '{}' ({})".format(self.value, self.type))
 
-        value_font_size = 0.20 * inch
-        small_font_size = 0.08 * inch
+        text_width = rect.width * TEXT_COLUMN_WIDTH
+        value_font_size = fit_font_size(self.value, ctx.font, 0.20 * inch, text_width)
+        small_font_size = fit_common_font_size(
+            (self.str1, self.str2, self.str3), ctx.font, 0.08 * inch * 1.35, text_width) / 1.35
 
         text_x = rect.left + rect.width/2 
         text_bottom = rect.bottom + rect.height/4 - value_font_size/3
-        c.setFont('main', value_font_size * 1)
+        c.setFont(ctx.font, value_font_size * 1)
         c.drawCentredString(text_x, text_bottom, self.value)
         c.drawCentredString(text_x, text_bottom+rect.height/2, self.value)
 
@@ -240,7 +256,7 @@ class BasicComponent(Component):
         c.setLineCap(1)
         
         for i in (0,rect.height/2):
-            c.setFont('main', small_font_size * 1.35)
+            c.setFont(ctx.font, small_font_size * 1.35)
 
             bottom = small_text_bottom
             
@@ -256,7 +272,7 @@ class BasicComponent(Component):
                 c.drawCentredString(small_text_x, i + bottom, self.str3)
                 bottom -= rect.height / 8
 
-            self.draw_icon(c, rect.left + rect.width / 6, rect.bottom + rect.height/4 + i, rect.height / 6)
+            self.draw_icon(c, rect.left + rect.width / 6, rect.bottom + rect.height/4 + i, rect.height / 6, ctx)
         
         c.setLineCap(0)
 
@@ -1,10 +1,19 @@
+from __future__ import annotations
+
 from src.components.component import BasicComponent
+from src.parameters import parse_quantity
 
 from reportlab.lib.colors import Color, black
-from reportlab.pdfgen.canvas import Canvas
 
 from math import atan
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.rendercontext import RenderContext
+
 class Diode(BasicComponent):
     def __init__(self, name: str, vf: str, ifwd: str, vr: str):
         self.value = name
@@ -12,6 +21,7 @@ class Diode(BasicComponent):
         self.str1 = "Vf = {}".format(vf)
         self.str2 = "If = {}".format(ifwd)
         self.str3 = "Vr = {}".format(vr)
+        self.params = {"vf": parse_quantity(vf), "ifwd": parse_quantity(ifwd), "vr": parse_quantity(vr)}
 
     def draw_diode(self, c: Canvas, x: float, y: float, size: float) -> None:
         c.line(x - size, y, x - size / 3, y)
@@ -23,11 +33,11 @@ class Diode(BasicComponent):
 
         c.line(x + size / 3, y - size / 2, x + size / 3, y + size / 2)
 
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_diode(c, x, y, size)
 
 class SchottkyDiode(Diode):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_diode(c, x, y, size)
 
         c.line(x + size / 3, y - size / 2, x + size / 3 - size / 6, y - size / 2)
@@ -40,26 +50,39 @@ class ZenerDiode(Diode):
         self.str1 = "Vr = {}".format(vr)
         self.str2 = "Ir = {}".format(ir)
         self.str3 = "Vf = {}".format(vf)
+        self.params = {"vr": parse_quantity(vr), "ir": parse_quantity(ir), "vf": parse_quantity(vf)}
 
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_diode(c, x, y, size)
 
         c.line(x + size / 3, y - size / 2, x + size / 3 - size / 6, y - size / 2 - size / 6)
         c.line(x + size / 3, y + size / 2, x + size / 3 + size / 6, y + size / 2 + size / 6)
 
 class LED(Diode):
-    def __init__(self, name: str, vf: str, ifwd: str, wl: str, color: Color):
+    def __init__(self, name: str, vf: str, ifwd: str, wl: str, color: Color | str):
         self.value = name
         self.type = "diode"
         self.color = color
         self.str1 = "Vf = {}".format(vf)
         self.str2 = "If = {}".format(ifwd)
         self.str3 = "λ = {}".format(wl)
+        self.params = {"vf": parse_quantity(vf), "ifwd": parse_quantity(ifwd), "wl": parse_quantity(wl)}
+
+    def get_identity(self) -> str:
+        # LEDs of the same size only differ by their colour
+        if isinstance(self.color, str):
+            return "{} {}".format(self.value, self.color)
+        return "{} {}".format(self.value, self.str3)
 
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.saveState()
 
-        c.setFillColor(self.color)
+        # Colours given by name are looked up in the palette of the context
+        if isinstance(self.color, str):
+            c.setFillColor(ctx.get_palette().led(self.color))
+        else:
+            c.setFillColor(self.color)
+
         path = c.beginPath()
         path.moveTo(x - size / 3, y - size / 2)
         path.lineTo(x + size / 3, y)
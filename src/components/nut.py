@@ -1,9 +1,17 @@
-from reportlab.pdfgen.canvas import Canvas
+from __future__ import annotations
 
 from src.components.component import BasicComponent
+from src.parameters import parse_quantity, parse_thread
 
 from math import sin, cos, pi
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.rendercontext import RenderContext
+
 class Nut(BasicComponent):
     def __init__(self, name: str, h: str, s: str, d: str):
         self.value = name
@@ -11,16 +19,20 @@ class Nut(BasicComponent):
         self.str1 = "h = {}".format(h)
         self.str2 = "s = {}".format(s)
         self.str3 = "d = {}".format(d)
+        self.params = {
+            "thread": parse_thread(name)[0],
+            "h": parse_quantity(h), "s": parse_quantity(s), "d": parse_quantity(d),
+        }
 
 class HexNut(Nut):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         for i in range(6):
             c.line(x + cos(i * pi / 3) * size, y + sin(i * pi / 3) * size, x + cos((i + 1) * pi / 3) * size, y + sin((i + 1) * pi / 3) * size)
         
         c.circle(x, y, size / 2)
 
 class SquareNut(Nut):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size, y - size, x + size, y - size)
         c.line(x + size, y - size, x + size, y + size)
         c.line(x + size, y + size, x - size, y + size)
@@ -35,8 +47,9 @@ class Washer(BasicComponent):
         self.str1 = "h = {}".format(h)
         self.str2 = "s = {}".format(s)
         self.str3 = None
+        self.params = {"thread": parse_thread(name)[0], "h": parse_quantity(h), "s": parse_quantity(s)}
     
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.circle(x, y, size)
         c.circle(x, y, size / 2)
 
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any, Dict, List, Tuple, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Every component class along with the module it lives in. The modules are only
+# imported once a class from them is actually requested, so a job that only
+# contains resistors never pays for importing the transistor or screw code.
+COMPONENT_CLASSES: Dict[str, str] = {
+    "Resistor": "src.components.resistor",
+    "Capacitor": "src.components.capacitor",
+    "NPNBJT": "src.components.transistor",
+    "PNPBJT": "src.components.transistor",
+    "NMOSFET": "src.components.transistor",
+    "PMOSFET": "src.components.transistor",
+    "Diode": "src.components.diode",
+    "SchottkyDiode": "src.components.diode",
+    "ZenerDiode": "src.components.diode",
+    "LED": "src.components.diode",
+    "SquareNut": "src.components.nut",
+    "HexNut": "src.components.nut",
+    "Washer": "src.components.nut",
+    "RecessedHeadScrew": "src.components.screw",
+    "RoundHeadScrew": "src.components.screw",
+    "FlatHeadScrew": "src.components.screw",
+    "ThreadedInsert": "src.components.threadedinsert",
+    "CompressionSpring": "src.components.spring",
+    "ExtensionSpring": "src.components.spring",
+}
+
+# Component type names mapped to the classes implementing them. The first
+# class of each entry is the one created when only the type name is given.
+COMPONENT_TYPES: Dict[str, Tuple[str, ...]] = {
+    "resistor": ("Resistor",),
+    "capacitor": ("Capacitor",),
+    "BJT": ("NPNBJT", "PNPBJT"),
+    "FET": ("NMOSFET", "PMOSFET"),
+    "diode": ("Diode", "SchottkyDiode", "ZenerDiode"),
+    "LED": ("LED",),
+    "nut": ("HexNut", "SquareNut"),
+    "washer": ("Washer",),
+    "screw": ("RoundHeadScrew", "FlatHeadScrew", "RecessedHeadScrew"),
+    "insert": ("ThreadedInsert",),
+    "spring": ("CompressionSpring", "ExtensionSpring"),
+}
+
+_CLASS_TYPES: Dict[str, str] = {
+    name: type_name for (type_name, names) in COMPONENT_TYPES.items() for name in names
+}
+
+_loaded_classes: Dict[str, Type[Component]] = {}
+
+def get_component_class(name: str) -> Type[Component]:
+    # Accept both class names ("NPNBJT") and type names ("BJT")
+    if name not in COMPONENT_CLASSES and name in COMPONENT_TYPES:
+        name = COMPONENT_TYPES[name][0]
+
+    cls = _loaded_classes.get(name)
+
+    if cls is None:
+        if name not in COMPONENT_CLASSES:
+            raise KeyError(f"Unknown component '{name}'")
+
+        cls = getattr(import_module(COMPONENT_CLASSES[name]), name)
+        _loaded_classes[name] = cls
+
+    return cls
+
+def get_type_classes(type_name: str) -> List[Type[Component]]:
+    if type_name not in COMPONENT_TYPES:
+        raise KeyError(f"Unknown component type '{type_name}'")
+
+    return [get_component_class(name) for name in COMPONENT_TYPES[type_name]]
+
+def get_type_name(component: Component) -> str:
+    # Subclasses defined outside of the registry resolve to their parent's type
+    for cls in type(component).__mro__:
+        if cls.__name__ in _CLASS_TYPES:
+            return _CLASS_TYPES[cls.__name__]
+
+    raise KeyError(f"Unknown component class '{type(component).__name__}'")
+
+def get_class_name(component: Component) -> str:
+    # The registered class of the component, also for subclasses defined elsewhere
+    for cls in type(component).__mro__:
+        if cls.__name__ in _CLASS_TYPES:
+            return cls.__name__
+
+    raise KeyError(f"Unknown component class '{type(component).__name__}'")
+
+def create_component(name: str, *args: Any, **kwargs: Any) -> Component:
+    return get_component_class(name)(*args, **kwargs)
+
+def loaded_component_classes() -> List[str]:
+    return list(_loaded_classes)
+
+def __getattr__(name: str) -> Type[Component]:
+    # Allows `registry.Resistor(...)` while still importing lazily
+    if name in COMPONENT_CLASSES:
+        return get_component_class(name)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,12 +1,22 @@
+from __future__ import annotations
+
 from src.stickerrect import StickerRect
-from src.components.component import Component
+from src.components.component import Component, TEXT_COLUMN_WIDTH
+from src.palette import COLORCODE_LIGHT, COLORCODE_DARK
+from src.textfit import fit_font_size
+from src.parameters import exact
+from src.rendercontext import DEFAULT_CONTEXT, RenderContext
 
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.lib.colors import black, toColor, red
+from reportlab.lib.colors import black, red
 from reportlab.lib.units import inch
 
 import math
 
+from typing import Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
 class Resistor(Component):
     def __init__(self, ohms: float, precise: bool = False):
         self.units = "\u2126"
@@ -26,6 +36,8 @@ class Resistor(Component):
 
         self.val = val
         self.exp = exp
+        self._texts: Tuple[str, ...] | None = None
+        self.params = {"r": exact(ohms, "Ω")}
 
     def get_3digit_code(self) -> str:
         if self.val % 10 != 0:
@@ -125,7 +137,24 @@ class Resistor(Component):
 
         return digits + multiplier
 
-    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool) -> None:
+    def get_identity(self) -> str:
+        if self.precise:
+            return self.format_value() + " precise"
+        return self.format_value()
+
+    def prepare(self) -> None:
+        self._texts = (self.format_value(), self.get_3digit_code(), self.get_4digit_code(), self.get_eia98_code())
+
+    def get_texts(self) -> Tuple[str, ...]:
+        # The value and codes do not depend on the layout, so they are only
+        # computed once, no matter how many times the sticker gets drawn
+        if self._texts is None:
+            self.prepare()
+            assert self._texts is not None
+        return self._texts
+
+    def draw(self, c: Canvas, rect: StickerRect, draw_center_line: bool,
+             ctx: RenderContext = DEFAULT_CONTEXT) -> None:
         # Draw middle line
         if draw_center_line:
             c.setStrokeColor(black, 0.25)
@@ -136,16 +165,15 @@ class Resistor(Component):
                    rect.bottom + rect.height/2)
 
         # Draw resistor value
-        print("Generating sticker '{}'".format(self.format_value()))
+        (value_string, code3, code4, eia98) = self.get_texts()
+        print("Generating sticker '{}'".format(value_string))
 
-        value_font_size = 0.25 * inch
+        value_font_size = fit_font_size(value_string, ctx.font, 0.25 * inch, rect.width * TEXT_COLUMN_WIDTH)
         smd_font_size = 0.08 * inch
 
-        value_string = self.format_value()
-
         text_middle = rect.left + rect.width/2
         text_bottom = rect.bottom + rect.height/4 - value_font_size/5
-        c.setFont('main', value_font_size * 1)
+        c.setFont(ctx.font, value_font_size * 1)
         if self.precise:
             c.setFillColor(red)
 
@@ -158,18 +186,18 @@ class Resistor(Component):
         for bottom in (rect.bottom+rect.height/16, rect.bottom+rect.height*8/16):
             for stripes in (3,4):
                 self.draw_colorcode(c,
-                                        toColor("hsl(55, 54%, 100%)"), toColor("hsl(55, 54%, 70%)"),
+                                        COLORCODE_LIGHT, COLORCODE_DARK,
                                         rect.left+rect.width*((stripes-3)*2/3),
                                         bottom,
                                         rect.width/3, rect.height*7/16,
-                                        stripes)
+                                        stripes, ctx=ctx)
 
-        c.setFont('main', smd_font_size * 1.35)
+        c.setFont(ctx.font, smd_font_size * 1.35)
         for i in (0,rect.height/2):
             c.drawString(rect.left + rect.width/3, rect.bottom +
-                        rect.height/13+i, self.get_3digit_code())
+                        rect.height/13+i, code3)
             c.drawCentredString(rect.left + rect.width/2, rect.bottom +
-                                rect.height/13+i, self.get_4digit_code())
+                                rect.height/13+i, code4)
             c.drawRightString(rect.left + rect.width*2/3, rect.bottom +
-                            rect.height/13+i, self.get_eia98_code())
+                            rect.height/13+i, eia98)
 
@@ -1,6 +1,14 @@
+from __future__ import annotations
+
 from src.components.component import BasicComponent
+from src.parameters import parse_quantity, parse_thread
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
 
-from reportlab.pdfgen.canvas import Canvas
+    from src.rendercontext import RenderContext
 
 class Screw(BasicComponent):
     def __init__(self, name: str, a: str, h: str, l: str | None = None):
@@ -14,6 +22,20 @@ class Screw(BasicComponent):
         else:
             self.str3 = None
 
+        # The length is either given separately, or as part of the name ("M3x12")
+        (thread, length) = parse_thread(name)
+        self.params = {
+            "thread": thread,
+            "a": parse_quantity(a), "h": parse_quantity(h),
+            "l": parse_quantity(l) if l != None else length,
+        }
+
+    def get_identity(self) -> str:
+        # The length is either part of the name already, or given separately
+        if self.str3 != None:
+            return "{}, {}".format(self.value, self.str3)
+        return self.value
+
     def draw_screw_thread(self, c: Canvas, x: float, y: float, r: float, h: float) -> None:
         c.line(x - r, y, x + r, y)
         c.line(x - r, y, x - r, y - h)
@@ -24,7 +46,7 @@ class Screw(BasicComponent):
             c.line(x - r, y - (i + 1) * h / 3, x + r, y - i * h / 3)
     
 class RecessedHeadScrew(Screw):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size, y + size, x + size, y + size)
         c.line(x - size, y + size, x - size / 2, y)
         c.line(x + size, y + size, x + size / 2, y)
@@ -33,7 +55,7 @@ class RecessedHeadScrew(Screw):
         self.draw_screw_thread(c, x, y, size / 2, size)
 
 class RoundHeadScrew(Screw):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size, y, x + size, y)
         c.line(x - size, y, x - size, y + size / 2)
         c.line(x + size, y, x + size, y + size / 2)
@@ -43,7 +65,7 @@ class RoundHeadScrew(Screw):
         self.draw_screw_thread(c, x, y, size / 2, size)
 
 class FlatHeadScrew(Screw):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size, y, x + size, y)
         c.line(x - size, y, x - size, y + size)
         c.line(x + size, y, x + size, y + size)
@@ -1,6 +1,14 @@
+from __future__ import annotations
+
 from src.components.component import BasicComponent
+from src.parameters import parse_quantity
+
+from typing import TYPE_CHECKING
 
-from reportlab.pdfgen.canvas import Canvas
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.rendercontext import RenderContext
 
 class Spring(BasicComponent):
     def __init__(self, d: str, l: str):
@@ -9,6 +17,10 @@ class Spring(BasicComponent):
         self.str1 = "d = {}".format(d)
         self.str2 = None
         self.str3 = None
+        self.params = {"d": parse_quantity(d), "l": parse_quantity(l)}
+
+    def get_identity(self) -> str:
+        return "{}, l = {}".format(self.str1, self.value)
 
     def draw_spring(self, c: Canvas, x: float, y: float, w: float, h: float, loops: int):
         for i in range(loops):
@@ -18,11 +30,11 @@ class Spring(BasicComponent):
             c.line(x - w / 2, y - h / 2 + i * h / loops, x + w / 2, y - h / 2 + i * h / loops)
 
 class CompressionSpring(Spring):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_spring(c, x, y, size * 1.5, size * 2, 4)
 
 class ExtensionSpring(Spring):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_spring(c, x, y, size * 1.5, size, 2)
         c.circle(x - size * .75, y + size / 2 + size / 4, size / 4)
         c.circle(x + size * .75, y - size / 2 - size / 4, size / 4)
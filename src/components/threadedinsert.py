@@ -1,6 +1,14 @@
+from __future__ import annotations
+
 from src.components.component import BasicComponent
+from src.parameters import parse_quantity, parse_thread
+
+from typing import TYPE_CHECKING
 
-from reportlab.pdfgen.canvas import Canvas
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.rendercontext import RenderContext
 
 class ThreadedInsert(BasicComponent):
     def __init__(self, name: str, d: str, l: str):
@@ -9,6 +17,10 @@ class ThreadedInsert(BasicComponent):
         self.str1 = "d = {}".format(d)
         self.str2 = "l = {}".format(l)
         self.str3 = None
+        self.params = {"thread": parse_thread(name)[0], "d": parse_quantity(d), "l": parse_quantity(l)}
+
+    def get_identity(self) -> str:
+        return "{}, {}, {}".format(self.value, self.str1, self.str2)
 
     def draw_insert(self, c: Canvas, x: float, y: float, w: float, thinw: float, h: float):
         c.line(x - w / 2, y + h / 2, x + w / 2, y + h / 2)
@@ -34,5 +46,5 @@ class ThreadedInsert(BasicComponent):
 
         c.line(x - w / 2, y - h / 2, x + w / 2, y - h / 2)
 
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         self.draw_insert(c, x, y, size * 1.5, size * 1.2, size * 2)
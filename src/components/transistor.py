@@ -1,9 +1,17 @@
-from src.components.component import BasicComponent
+from __future__ import annotations
 
-from reportlab.pdfgen.canvas import Canvas
+from src.components.component import BasicComponent
+from src.parameters import parse_quantity
 
 from math import atan, pi, hypot
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.rendercontext import RenderContext
+
 class BipolarJunctionTransistor(BasicComponent):
     def __init__(self, name: str, cpin: str, bpin: str, epin: str, vbe: str, ic: str, vce: str):
         self.value = name
@@ -11,11 +19,12 @@ class BipolarJunctionTransistor(BasicComponent):
         self.str1 = "Vbe = {}".format(vbe)
         self.str2 = "Ic = {}".format(ic)
         self.str3 = "Vce = {}".format(vce)
+        self.params = {"vbe": parse_quantity(vbe), "ic": parse_quantity(ic), "vce": parse_quantity(vce)}
         self.cpin = cpin
         self.bpin = bpin
         self.epin = epin
 
-    def draw_transistor(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_transistor(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size / 1.5, y, x, y)
         c.line(x, y - size / 1.5, x, y + size / 1.5)
 
@@ -25,22 +34,22 @@ class BipolarJunctionTransistor(BasicComponent):
         c.line(x, y - size / 4, x + size / 1.5, y - 3 * size / 4)
         c.line(x + size / 1.5, y - 3 * size / 4, x + size / 1.5, y - size)
         
-        c.setFont('main', size / 1.5)
+        c.setFont(ctx.font, size / 1.5)
         c.drawString(x + size, y + size - size / 3, "{}".format(self.cpin))
         c.drawString(x + size, y - size, "{}".format(self.epin))
         c.drawRightString(x - size, y - size / 4, "{}".format(self.bpin))
 
 class NPNBJT(BipolarJunctionTransistor):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
-        self.draw_transistor(c, x, y, size)
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
+        self.draw_transistor(c, x, y, size, ctx)
         self.draw_arrow(c, x, y - size / 4, hypot(size / 1.5, size / 2), size / 3, -atan(1.5/2))
 
 class PNPBJT(BipolarJunctionTransistor):
     def __init__(self, name: str, cpin: str, bpin: str, epin: str, vbe: str, ic: str, vce: str):
         super().__init__(name, epin, bpin, cpin, vbe, ic, vce)
 
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
-        self.draw_transistor(c, x, y, size)
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
+        self.draw_transistor(c, x, y, size, ctx)
         self.draw_arrow(c, x + size / 1.5, y + 3 * size / 4, size / 2, size / 3, atan(1.5/2) + pi)
 
 class FieldEffectTransistor(BasicComponent):
@@ -50,11 +59,12 @@ class FieldEffectTransistor(BasicComponent):
         self.str1 = "Vgs = {}".format(vgs)
         self.str2 = "Id = {}".format(id)
         self.str3 = "Vds = {}".format(vds)
+        self.params = {"vgs": parse_quantity(vgs), "id": parse_quantity(id), "vds": parse_quantity(vds)}
         self.gpin = gpin
         self.dpin = dpin
         self.spin = spin
 
-    def draw_transistor(self, c: Canvas, x: float, y: float, size: float) -> None:
+    def draw_transistor(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
         c.line(x - size / 4, y - size / 2, x - size / 4, y + size / 2)
         
         c.line(x, y - size / 8, x, y + size / 8)
@@ -71,18 +81,18 @@ class FieldEffectTransistor(BasicComponent):
         c.line(x, y - 4 * size / 8, x + 3 * size / 4, y - 4 * size / 8)
         c.line(x + 3 * size / 4, y, x + 3 * size / 4, y - size)
         
-        c.setFont('main', size / 1.5)
+        c.setFont(ctx.font, size / 1.5)
         c.drawString(x + size, y + size - size / 3, "{}".format(self.dpin))
         c.drawString(x + size, y - size, "{}".format(self.spin))
         c.drawRightString(x - size / 2, y - size / 4, "{}".format(self.gpin))
 
 class NMOSFET(FieldEffectTransistor):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
-        self.draw_transistor(c, x, y, size)
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
+        self.draw_transistor(c, x, y, size, ctx)
         self.draw_arrow(c, x + 3 * size / 4, y, 3 * size / 4, size / 3, pi)
 
 class PMOSFET(FieldEffectTransistor):
-    def draw_icon(self, c: Canvas, x: float, y: float, size: float) -> None:
-        self.draw_transistor(c, x, y, size)
+    def draw_icon(self, c: Canvas, x: float, y: float, size: float, ctx: RenderContext) -> None:
+        self.draw_transistor(c, x, y, size, ctx)
         self.draw_arrow(c, x, y, 3 * size / 4, size / 3, 0)
 
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Tuple, TYPE_CHECKING
+
+import hashlib
+import json
+import os
+import re
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Turns the markings read off a part back into its value: SMD codes ("472",
+# "4R7", "01C", "S3") and colour bands ("yellow violet red"). All values that
+# the stickers can show are encoded once into an index from code to values,
+# which is kept on disk, so that every lookup afterwards is a dictionary access.
+#
+#   index = load_index(".decode-index.json")
+#   for value in index.lookup("472"): print(value)
+
+BAND_NAMES = ("black", "brown", "red", "orange", "yellow", "green", "blue", "violet", "grey", "white")
+
+# Multiplier bands below 10^0
+_MULTIPLIER_NAMES = {-1: "gold", -2: "silver"}
+
+_BAND_ALIASES = {"gray": "grey", "purple": "violet"}
+
+_BAND_VALUES: Dict[str, int] = {
+    **{name: value for (value, name) in enumerate(BAND_NAMES)},
+    **{name: value for (value, name) in _MULTIPLIER_NAMES.items()},
+}
+
+# The values covered, as powers of ten of their first digit: 1 mΩ up to
+# 9.99 GΩ, and 0.1 pF up to 99.9 mF
+_RESISTOR_EXPONENTS = range(-3, 10)
+_CAPACITOR_EXPONENTS = range(-13, -1)
+
+# The modules doing the encoding. The index gets rebuilt whenever they change.
+_ENCODER_FILES = ("components/resistor.py", "components/capacitor.py", "components/component.py")
+
+class DecodedValue:
+    def __init__(self, kind: str, part: str, value: float, text: str) -> None:
+        # Which marking matched, e.g. "3 digit code" or "4 bands"
+        self.kind = kind
+        # The component type, "resistor" or "capacitor"
+        self.part = part
+        self.value = value
+        self.text = text
+
+    def __str__(self) -> str:
+        return "{} {} ({})".format(self.text, self.part, self.kind)
+
+def band_key(bands: Iterable[int]) -> str:
+    # Colour bands as a lookup key, e.g. "yellow violet red"
+    return " ".join(BAND_NAMES[band] if band >= 0 else _MULTIPLIER_NAMES[band] for band in bands)
+
+def _color_bands(component: Component, num_codes: int, exp_shift: int = 0) -> Tuple[int, ...] | None:
+    # The bands drawn by Component.draw_colorcode, if they show the value
+    # completely and only use colours that exist
+    if component.val == 0:
+        return (0,)
+
+    digits = num_codes - 1
+    if component.val % 10 ** (3 - digits) != 0:
+        return None
+
+    multiplier = component.exp + exp_shift + 2 - num_codes
+    if not (-2 <= multiplier <= 9):
+        return None
+
+    return tuple(int(digit) for digit in str(component.val)[:digits]) + (multiplier,)
+
+def _codes(component: Component) -> Iterator[Tuple[str, str]]:
+    from src.components.capacitor import Capacitor
+    from src.components.resistor import Resistor
+
+    # Every marking of the component along with its kind, as on the sticker
+    if isinstance(component, Resistor):
+        yield ("3 digit code", component.get_3digit_code())
+        yield ("4 digit code", component.get_4digit_code())
+        yield ("EIA-96 code", component.get_eia98_code())
+        for num_codes in (3, 4):
+            bands = _color_bands(component, num_codes)
+            if bands is not None:
+                yield ("{} bands".format(num_codes), band_key(bands))
+    elif isinstance(component, Capacitor):
+        # Below 1 pF the 3 digit code would need a negative multiplier
+        if component.exp >= -12:
+            yield ("3 digit code", component.get_3digit_code())
+        yield ("EIA-198 code", component.get_eia198_code())
+        bands = _color_bands(component, 3, 12)
+        if bands is not None:
+            yield ("3 bands (pF)", band_key(bands))
+
+def _candidates() -> Iterator[Tuple[str, float, Component]]:
+    from src.components.capacitor import Capacitor
+    from src.components.resistor import Resistor
+
+    yield ("resistor", 0, Resistor(0))
+    yield ("capacitor", 0, Capacitor(0))
+
+    # Three significant digits is all that any of the codes can hold
+    for (part, cls, exponents) in (("resistor", Resistor, _RESISTOR_EXPONENTS),
+                                   ("capacitor", Capacitor, _CAPACITOR_EXPONENTS)):
+        for exp in exponents:
+            for val in range(100, 1000):
+                value = val * 10 ** (exp - 2) if exp >= 2 else val / 10 ** (2 - exp)
+                component = cls(value)
+
+                # Values which do not survive the float round trip would show up
+                # under the code of a neighbour
+                if (component.val, component.exp) == (val, exp):
+                    yield (part, value, component)
+
+def build_index() -> Dict[str, List[DecodedValue]]:
+    entries: Dict[str, List[DecodedValue]] = {}
+
+    for (part, value, component) in _candidates():
+        text = component.format_value()
+
+        for (kind, code) in _codes(component):
+            values = entries.setdefault(code, []) if code else []
+
+            # 0 Ω is a single black band, whatever the number of bands
+            if code and not any(v.part == part and v.value == value for v in values):
+                values.append(DecodedValue(kind, part, value, text))
+
+    return entries
+
+def _encoder_hash() -> str:
+    h = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in _ENCODER_FILES + (os.path.basename(__file__),):
+        with open(os.path.join(directory, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def normalize(code: str) -> str:
+    # Colour bands in any common spelling ("Yellow-Violet-Red", "gray") become
+    # the key of the index, SMD codes are kept as they are: in EIA-198, the
+    # case of the letter is part of the value
+    words = [word for word in re.split(r"[\s,;/-]+", code.strip().lower()) if word]
+    words = [_BAND_ALIASES.get(word, word) for word in words]
+
+    if words and all(word in _BAND_VALUES for word in words):
+        return " ".join(words)
+
+    return code.strip()
+
+class CodeIndex:
+    def __init__(self, entries: Dict[str, List[DecodedValue]]) -> None:
+        self.entries = entries
+
+    def lookup(self, code: str) -> List[DecodedValue]:
+        key = normalize(code)
+        values = self.entries.get(key)
+
+        # "4r7" is no EIA-198 code, so it can only be meant as "4R7"
+        if values is None:
+            values = self.entries.get(key.upper(), [])
+
+        return values
+
+    def decode_lines(self, lines: Iterable[str]) -> Iterator[Tuple[str, List[DecodedValue]]]:
+        # One code per line, e.g. from a scanner log. Blank lines are skipped.
+        for line in lines:
+            code = line.strip()
+            if code:
+                yield (code, self.lookup(code))
+
+def save_index(filename: str, entries: Dict[str, List[DecodedValue]]) -> None:
+    data = {
+        "encoder": _encoder_hash(),
+        "codes": {code: [[value.kind, value.part, value.value, value.text] for value in values]
+                  for (code, values) in entries.items()},
+    }
+
+    # Written under a temporary name first, so that a concurrent run never
+    # reads a half written index
+    with open(filename + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(filename + ".tmp", filename)
+
+def load_index(filename: str | None = None) -> CodeIndex:
+    # Reads the index from `filename`, or builds it (and writes it there) if it
+    # is missing or was built by a different version of the encoding code
+    if filename is not None and os.path.exists(filename):
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("encoder") == _encoder_hash():
+            return CodeIndex({code: [DecodedValue(*value) for value in values]
+                              for (code, values) in data["codes"].items()})
+
+    entries = build_index()
+    if filename is not None:
+        save_index(filename, entries)
+
+    return CodeIndex(entries)
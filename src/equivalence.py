@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from src.main import create_canvas, register_fonts, render_stickers
+from src.paperconfig import PaperConfig
+from src.stickerrect import page_transform, sticker_slots
+
+from typing import Any, List, Sequence, Tuple, TYPE_CHECKING
+
+import contextlib
+import io
+import os
+import tempfile
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# The ways of rendering a job which can be compared against each other.
+# "reference" is the straightforward one: every drawing operation goes to the
+# canvas as it is. "parts" renders in chunks of pages like split output does
+# (one after the other here, running them in parallel does not change them).
+RENDER_PATHS = ("reference", "state", "batched", "parts")
+
+# Pages per chunk of the "parts" path
+_PAGES_PER_PART = 10
+
+# Pixels whose grey values differ by less than this only differ in
+# anti-aliasing, which moves around a little when paths get merged
+PIXEL_THRESHOLD = 64
+
+class StickerDifference:
+    def __init__(self, path: str, position: int, page: int, component: Component | None, ratio: float) -> None:
+        self.path = path
+        self.position = position
+        self.page = page
+        self.component = component
+        # Fraction of the sticker's pixels which differ
+        self.ratio = ratio
+
+    def __str__(self) -> str:
+        name = type(self.component).__name__ if self.component is not None else "empty"
+        return "{}: sticker {} ({}) on page {} differs in {:.2%} of its pixels".format(
+            self.path, self.position, name, self.page + 1, self.ratio)
+
+def render_path(
+    path: str,
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    directory: str,
+) -> List[str]:
+    # Renders the job in the given way, returns the files in page order
+    if path not in RENDER_PATHS:
+        raise KeyError(f"Unknown render path '{path}', use one of {', '.join(RENDER_PATHS)}")
+
+    if path == "parts":
+        from src.outputplan import plan_output, render_part
+
+        parts = plan_output(values, layout, os.path.join(directory, "parts"), max_pages=_PAGES_PER_PART)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for part in parts:
+                render_part(part, layout, draw_outlines, draw_center_line)
+        return [part.filename for part in parts]
+
+    filename = os.path.join(directory, path + ".pdf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        c = create_canvas(filename, layout)
+        render_stickers(c, layout, list(values), draw_outlines, draw_center_line,
+                        batch_paths=path == "batched", track_state=path != "reference")
+        c.save()
+
+    return [filename]
+
+class _Raster:
+    def __init__(self, pixmap: Any) -> None:
+        self.width = pixmap.width
+        self.height = pixmap.height
+        self.stride = pixmap.stride
+        # A copy is made on every access of the samples, so only once here
+        self.samples: bytes = pixmap.samples
+
+def _rasterize(filenames: List[str], dpi: int) -> List[_Raster]:
+    import pymupdf
+
+    pages: List[_Raster] = []
+    for filename in filenames:
+        with pymupdf.open(filename) as document:
+            pages.extend(_Raster(page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY)) for page in document)
+    return pages
+
+def _sticker_boxes(layout: PaperConfig, dpi: int) -> List[Tuple[int, int, int, int]]:
+    # Pixel boxes (x0, y0, x1, y1) of the sticker slots, in position order.
+    # The slots are on the unrotated page, so they go through the same
+    # transform as the drawing does to land on the output page.
+    (a, b, c, d, e, f) = page_transform(layout) or (1, 0, 0, 1, 0, 0)
+    page_height = layout.output_pagesize[1]
+    scale = dpi / 72
+
+    boxes = []
+    for row in sticker_slots(layout):
+        for (left, bottom) in row:
+            corners = [(x, y) for x in (left, left + layout.sticker_width)
+                       for y in (bottom, bottom + layout.sticker_height)]
+            xs = [a * x + c * y + e for (x, y) in corners]
+            # Pixel rows count from the top of the page
+            ys = [page_height - (b * x + d * y + f) for (x, y) in corners]
+            boxes.append((int(min(xs) * scale), int(min(ys) * scale),
+                          int(max(xs) * scale) + 1, int(max(ys) * scale) + 1))
+    return boxes
+
+def _differing_pixels(a: _Raster, b: _Raster, box: Tuple[int, int, int, int]) -> int:
+    (x0, y0, x1, y1) = box
+    x1 = min(x1, a.width)
+    y1 = min(y1, a.height)
+
+    differing = 0
+    for y in range(y0, y1):
+        start = y * a.stride
+        row_a = a.samples[start + x0:start + x1]
+        row_b = b.samples[start + x0:start + x1]
+
+        # Most rows are identical, only look at the pixels of the others
+        if row_a != row_b:
+            differing += sum(1 for (p, q) in zip(row_a, row_b) if abs(p - q) >= PIXEL_THRESHOLD)
+
+    return differing
+
+def check_equivalence(
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    paths: Sequence[str] = ("batched", "parts"),
+    dpi: int = 50,
+    tolerance: float = 0.005,
+) -> List[StickerDifference]:
+    # Renders the job the reference way and every one of `paths`, rasterizes
+    # the pages at a low resolution and compares them sticker by sticker.
+    # Returns the stickers whose differing pixels exceed `tolerance`. Needs
+    # pymupdf for the rasterizing.
+    register_fonts()
+
+    per_page = layout.num_stickers_horizontal * layout.num_stickers_vertical
+    boxes = _sticker_boxes(layout, dpi)
+
+    differences: List[StickerDifference] = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _rasterize(render_path("reference", values, layout, draw_outlines, draw_center_line, directory), dpi)
+
+        for path in paths:
+            pages = _rasterize(render_path(path, values, layout, draw_outlines, draw_center_line, directory), dpi)
+
+            if len(pages) != len(reference):
+                raise ValueError(f"'{path}' gave {len(pages)} pages instead of {len(reference)}")
+
+            for (number, (a, b)) in enumerate(zip(reference, pages)):
+                if a.samples == b.samples:
+                    continue
+
+                for (slot, box) in enumerate(boxes):
+                    position = number * per_page + slot
+                    if position >= len(values):
+                        break
+
+                    area = (box[2] - box[0]) * (box[3] - box[1])
+                    ratio = _differing_pixels(a, b, box) / area
+                    if ratio > tolerance:
+                        differences.append(StickerDifference(path, position, number, values[position], ratio))
+
+    return differences
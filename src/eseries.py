@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple, TYPE_CHECKING
+
+import math
+
+if TYPE_CHECKING:
+    from src.components.resistor import Resistor
+    from src.components.capacitor import Capacitor
+
+# IEC 60063 preferred numbers. The values are in hundredths, so that all of
+# the arithmetic stays exact.
+
+# E24 and below use historical values which do not follow the formula
+_E24 = (
+    100, 110, 120, 130, 150, 160, 180, 200, 220, 240, 270, 300,
+    330, 360, 390, 430, 470, 510, 560, 620, 680, 750, 820, 910,
+)
+
+def _e192() -> Tuple[int, ...]:
+    values = [round(100 * math.pow(10, i / 192)) for i in range(192)]
+
+    # The only value of E192 which does not match the formula
+    values[185] = 920
+    return tuple(values)
+
+_E192 = _e192()
+
+E_SERIES: Dict[str, Tuple[int, ...]] = {
+    "E3": _E24[::8],
+    "E6": _E24[::4],
+    "E12": _E24[::2],
+    "E24": _E24,
+    "E48": _E192[::4],
+    "E96": _E192[::2],
+    "E192": _E192,
+}
+
+def _series(name: str) -> Tuple[int, ...]:
+    if name not in E_SERIES:
+        raise KeyError(f"Unknown E series '{name}', use one of {', '.join(E_SERIES)}")
+    return E_SERIES[name]
+
+def _value(mantissa: int, exponent: int) -> float:
+    # mantissa * 10^(exponent - 2), without the rounding errors of floats
+    if exponent >= 2:
+        return float(mantissa * 10 ** (exponent - 2))
+    return mantissa / float(10 ** (2 - exponent))
+
+def series_values(name: str, start: float, stop: float) -> Iterator[float]:
+    # All values of the series in [start, stop), generated decade by decade
+    mantissas = _series(name)
+    exponent = math.floor(math.log10(start))
+
+    while _value(mantissas[0], exponent) < stop:
+        for mantissa in mantissas:
+            value = _value(mantissa, exponent)
+            if value >= stop:
+                return
+            if value >= start:
+                yield value
+        exponent += 1
+
+def resistors(name: str, start: float, stop: float, precise: bool = False) -> Iterator[Resistor]:
+    from src.components.resistor import Resistor
+
+    for value in series_values(name, start, stop):
+        yield Resistor(value, precise)
+
+def capacitors(name: str, start: float, stop: float) -> Iterator[Capacitor]:
+    # In farads, e.g. capacitors("E6", 10e-12, 1e-6)
+    from src.components.capacitor import Capacitor
+
+    for value in series_values(name, start, stop):
+        yield Capacitor(value)
+
+class NearestLookup:
+    # Snaps arbitrary values to the closest value of a series. Closeness is
+    # measured as a ratio, which is how the series are spaced.
+    def __init__(self, name: str) -> None:
+        mantissas = _series(name)
+
+        # Geometric midpoints between neighbouring values, including the step
+        # from the last value of a decade to the first one of the next
+        self._mantissas: List[int] = list(mantissas) + [mantissas[0] * 10]
+        self._bounds: List[float] = [
+            math.sqrt(a * b) for (a, b) in zip(self._mantissas, self._mantissas[1:])
+        ]
+
+    def nearest(self, value: float) -> float:
+        if value <= 0:
+            raise ValueError("Only positive values have a nearest standard value")
+
+        exponent = math.floor(math.log10(value))
+        mantissa = value / math.pow(10, exponent - 2)
+
+        index = bisect_left(self._bounds, mantissa)
+        if index == len(self._bounds):
+            # Above the last midpoint of the decade, i.e. the next decade's first value
+            return _value(self._mantissas[0], exponent + 1)
+
+        return _value(self._mantissas[index], exponent)
+
+    def snap(self, values: Iterable[float]) -> Iterator[float]:
+        for value in values:
+            yield self.nearest(value)
+
+_lookups: Dict[str, NearestLookup] = {}
+
+def nearest(name: str, value: float) -> float:
+    if name not in _lookups:
+        _lookups[name] = NearestLookup(name)
+    return _lookups[name].nearest(value)
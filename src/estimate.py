@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+from src.components.registry import COMPONENT_CLASSES, create_component, get_class_name
+from src.main import create_canvas, register_fonts, render_stickers
+from src.outputprofile import DEFAULT_PROFILE
+from src.paperconfig import PaperConfig, VYSOCINA
+from src.synthetic import synthetic_catalogue
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, TYPE_CHECKING
+
+import contextlib
+import io
+import json
+import math
+import os
+import time
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# A typical instance of every component class, for measuring what it costs
+_SAMPLES: Dict[str, Tuple[Any, ...]] = {
+    "Resistor": (4700,),
+    "Capacitor": (100e-9,),
+    "NPNBJT": ("BC547", "1", "2", "3", "0.9 (6) V", "100 mA", "45 V"),
+    "PNPBJT": ("BC557", "1", "2", "3", "-1 (-5) V", "-100 mA", "-45 V"),
+    "NMOSFET": ("IRF520", "1", "2", "3", "2..4 V", "6.5 A", "100 V"),
+    "PMOSFET": ("IRF9520", "1", "2", "3", "-2..4 V", "-4.8 A", "-100 V"),
+    "Diode": ("1N4148", "1 V", "300 mA", "75 V"),
+    "SchottkyDiode": ("1N5819", "600 mV", "1 A", "40 V"),
+    "ZenerDiode": ("ZPD3V6", "3.4-3.8 V", "5 mA", "1 V"),
+    "LED": ("5 mm", "1.9-2.1 V", "20 mA", "620-625 nm", "red"),
+    "SquareNut": ("M3", "1.8 mm", "5.4 mm", "7.2 mm"),
+    "HexNut": ("M3", "2.2 mm", "5.5 mm", "6.3 mm"),
+    "Washer": ("M3", "0.6 mm", "7 mm"),
+    "RecessedHeadScrew": ("M3x7", "5.6 mm", "2 mm"),
+    "RoundHeadScrew": ("M3x12", "6 mm", "2.6 mm"),
+    "FlatHeadScrew": ("M2.5x12", "4.4 mm", "1.8 mm"),
+    "ThreadedInsert": ("M3", "4.5 mm", "4 mm"),
+    "CompressionSpring": ("7 mm", "12.5 mm"),
+    "ExtensionSpring": ("5 mm", "20.5 mm"),
+}
+
+# Costs measured with calibrate() on the default layout, with the default
+# output profile and without part codes or outlines, in bytes and seconds. "file" is the
+# fixed cost of every output file (mostly the embedded font), "page" the one
+# of every page and "mixing" the one of a sticker of another class than the
+# one before it.
+DEFAULT_CALIBRATION: Dict[str, Tuple[float, float]] = {
+    "file": (15629, 0.00196),
+    "page": (400, 0.00006),
+    "Resistor": (298, 0.00061),
+    "Capacitor": (245, 0.00027),
+    "NPNBJT": (285, 0.00030),
+    "PNPBJT": (305, 0.00025),
+    "NMOSFET": (357, 0.00033),
+    "PMOSFET": (352, 0.00033),
+    "Diode": (162, 0.00010),
+    "SchottkyDiode": (196, 0.00021),
+    "ZenerDiode": (215, 0.00022),
+    "LED": (294, 0.00029),
+    "SquareNut": (272, 0.00025),
+    "HexNut": (299, 0.00026),
+    "Washer": (305, 0.00024),
+    "RecessedHeadScrew": (220, 0.00021),
+    "RoundHeadScrew": (289, 0.00024),
+    "FlatHeadScrew": (239, 0.00022),
+    "ThreadedInsert": (290, 0.00024),
+    "CompressionSpring": (186, 0.00017),
+    "ExtensionSpring": (359, 0.00024),
+    "mixing": (79, 0.0),
+}
+
+class JobEstimate:
+    def __init__(self, stickers: int, pages: int, bytes: int, seconds: float) -> None:
+        self.stickers = stickers
+        self.pages = pages
+        self.bytes = bytes
+        self.seconds = seconds
+
+    def __str__(self) -> str:
+        return "{} stickers on {} pages, about {:.2f} MB in {:.1f} s".format(
+            self.stickers, self.pages, self.bytes / 1e6, self.seconds)
+
+def _render(
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    profile: str = DEFAULT_PROFILE,
+    draw_codes: bool = False,
+    draw_outlines: bool = False,
+) -> Tuple[int, float]:
+    # Size and duration of rendering into memory. The progress output of the
+    # components is dropped, so that the terminal does not slow things down.
+    buffer = io.BytesIO()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        c = create_canvas(buffer, layout, profile=profile)  # type: ignore[arg-type]
+        render_stickers(c, layout, list(values), draw_outlines, True, draw_codes=draw_codes)
+        c.save()
+    seconds = time.perf_counter() - start
+
+    return (len(buffer.getvalue()), seconds)
+
+def _class_changes(values: Iterable[Component | None]) -> int:
+    # How often a sticker is of another class than the one before it
+    changes = 0
+    previous: type | None = None
+
+    for value in values:
+        if value is not None:
+            cls = type(value)
+            if previous is not None and cls is not previous:
+                changes += 1
+            previous = cls
+
+    return changes
+
+def _class_samples(count: int) -> Dict[str, List[Component]]:
+    # Up to `count` different components of every class. The page contents
+    # get compressed, and a page full of the same sticker compresses far
+    # better than the mixed stickers of a real job, so the costs have to be
+    # measured on varied ones. Classes the synthetic catalogue does not make
+    # fall back to their typical instance.
+    from src.jobcache import value_hash
+
+    samples: Dict[str, Dict[str, Component]] = {name: {} for name in _SAMPLES}
+
+    for value in synthetic_catalogue(150 * count, seed=1):
+        if value is not None:
+            distinct = samples[get_class_name(value)]
+            if len(distinct) < count:
+                distinct.setdefault(value_hash("", value), value)
+
+    return {
+        name: list(distinct.values()) or [create_component(name, *_SAMPLES[name])]
+        for (name, distinct) in samples.items()
+    }
+
+def calibrate(
+    layout: PaperConfig = VYSOCINA,
+    pages: int = 2,
+    profile: str = DEFAULT_PROFILE,
+    draw_codes: bool = False,
+    draw_outlines: bool = False,
+) -> Dict[str, Tuple[float, float]]:
+    # A quick micro-benchmark (a few seconds) measuring the costs of a file,
+    # a page and a sticker of every component class on this machine, for the
+    # given output profile and with or without the part codes and outlines
+    register_fonts()
+
+    per_page = layout.num_stickers_horizontal * layout.num_stickers_vertical
+    count = pages * per_page
+
+    # Warm up the font and the caches first
+    _render([create_component("Resistor", 1000)], layout, profile, draw_codes, draw_outlines)
+
+    # Costs of pages and stickers are the differences between jobs of
+    # different lengths, so that the font (which only gets embedded once)
+    # does not count towards them
+    (one_bytes, one_seconds) = _render([None], layout, profile, draw_codes, draw_outlines)
+    (blank_bytes, blank_seconds) = _render([None] * (count + 1), layout, profile, draw_codes, draw_outlines)
+    page = ((blank_bytes - one_bytes) / pages, (blank_seconds - one_seconds) / pages)
+
+    calibration: Dict[str, Tuple[float, float]] = {"page": page}
+    samples = _class_samples(2 * count)
+
+    for name in _SAMPLES:
+        values = [samples[name][i % len(samples[name])] for i in range(2 * count)]
+        (single_bytes, single_seconds) = _render(values[:count], layout, profile, draw_codes, draw_outlines)
+        (double_bytes, double_seconds) = _render(values, layout, profile, draw_codes, draw_outlines)
+        calibration[name] = (
+            max(0.0, (double_bytes - single_bytes - pages * page[0]) / count),
+            max(0.0, (double_seconds - single_seconds - pages * page[1]) / count),
+        )
+
+    # Everything else of a file with all kinds of stickers on it
+    mixed = [create_component(name, *args) for (name, args) in _SAMPLES.items()]
+    (mixed_bytes, mixed_seconds) = _render(mixed, layout, profile, draw_codes, draw_outlines)
+    mixed_pages = math.ceil(len(mixed) / per_page)
+
+    calibration["file"] = (
+        max(0.0, mixed_bytes - mixed_pages * page[0] - sum(calibration[name][0] for name in _SAMPLES)),
+        max(0.0, mixed_seconds - mixed_pages * page[1] - sum(calibration[name][1] for name in _SAMPLES)),
+    )
+
+    # Neighbouring stickers of different classes compress worse than those of
+    # the same class. The same stickers, once in the order of a mixed job and
+    # once sorted by class, tell what every change of the class costs. The
+    # time hardly depends on the order, the difference would only be noise.
+    shuffled = [value for value in synthetic_catalogue(10 * count, seed=2) if value is not None]
+    ordered = sorted(shuffled, key=get_class_name)
+    (shuffled_bytes, _) = _render(shuffled, layout, profile, draw_codes, draw_outlines)
+    (ordered_bytes, _) = _render(ordered, layout, profile, draw_codes, draw_outlines)
+    changes = _class_changes(shuffled) - _class_changes(ordered)
+
+    calibration["mixing"] = (max(0.0, (shuffled_bytes - ordered_bytes) / changes), 0.0)
+
+    return calibration
+
+def save_calibration(
+    filename: str,
+    calibration: Dict[str, Tuple[float, float]],
+    profile: str = DEFAULT_PROFILE,
+    draw_codes: bool = False,
+    draw_outlines: bool = False,
+) -> None:
+    costs: Dict[str, Any] = {name: list(cost) for (name, cost) in calibration.items()}
+    costs["options"] = {"profile": profile, "draw_codes": draw_codes, "draw_outlines": draw_outlines}
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(costs, f, indent=4)
+        f.write("\n")
+
+def load_calibration(
+    filename: str,
+    profile: str = DEFAULT_PROFILE,
+    draw_codes: bool = False,
+    draw_outlines: bool = False,
+) -> Dict[str, Tuple[float, float]] | None:
+    # None if the costs were measured with other options, and do not apply
+    with open(filename, encoding="utf-8") as f:
+        costs = json.load(f)
+
+    if costs.pop("options", None) != {"profile": profile, "draw_codes": draw_codes, "draw_outlines": draw_outlines}:
+        return None
+    return {name: (cost[0], cost[1]) for (name, cost) in costs.items()}
+
+def job_calibration(
+    layout: PaperConfig,
+    profile: str = DEFAULT_PROFILE,
+    draw_codes: bool = False,
+    draw_outlines: bool = False,
+    filename: str | None = None,
+) -> Dict[str, Tuple[float, float]] | None:
+    # The costs for a job with these options: saved in `filename` if they
+    # were measured with the same options, None for the built-in ones (the
+    # default profile without part codes or outlines), and measured right
+    # away otherwise. New measurements are saved to `filename`, if there is one.
+    calibration = None
+    if filename is not None and os.path.exists(filename):
+        calibration = load_calibration(filename, profile, draw_codes, draw_outlines)
+
+    if calibration is None and (filename is not None or profile != DEFAULT_PROFILE or draw_codes or draw_outlines):
+        calibration = calibrate(layout, profile=profile, draw_codes=draw_codes, draw_outlines=draw_outlines)
+        if filename is not None:
+            save_calibration(filename, calibration, profile, draw_codes, draw_outlines)
+
+    return calibration
+
+def _class_cost(cls: type, calibration: Dict[str, Tuple[float, float]]) -> Tuple[float, float]:
+    # Subclasses outside of the registry cost about as much as their parent
+    for base in cls.__mro__:
+        if base.__name__ in calibration and base.__name__ in COMPONENT_CLASSES:
+            return calibration[base.__name__]
+
+    # Unknown classes get the average of all the known ones
+    costs = [calibration[name] for name in COMPONENT_CLASSES if name in calibration]
+    return (sum(b for (b, _) in costs) / len(costs), sum(s for (_, s) in costs) / len(costs))
+
+def estimate_job(
+    values: Iterable[Component | None],
+    layout: PaperConfig,
+    calibration: Dict[str, Tuple[float, float]] | None = None,
+    files: int = 1,
+) -> JobEstimate:
+    # Predicts the outcome of render_stickers without drawing anything. This
+    # only counts the components by class, so it takes milliseconds even for
+    # jobs with hundreds of thousands of stickers.
+    if calibration is None:
+        calibration = DEFAULT_CALIBRATION
+
+    values = list(values)
+    classes: Counter[type] = Counter(map(type, values))
+    positions = sum(classes.values())
+    classes.pop(type(None), None)
+
+    per_page = layout.num_stickers_horizontal * layout.num_stickers_vertical
+    pages = max(1, math.ceil(positions / per_page))
+
+    (file_bytes, file_seconds) = calibration["file"]
+    (page_bytes, page_seconds) = calibration["page"]
+
+    # Older calibrations do not have the cost of mixing the classes yet
+    (mixing_bytes, mixing_seconds) = calibration.get("mixing", (0.0, 0.0))
+    changes = _class_changes(values)
+
+    total_bytes = files * file_bytes + pages * page_bytes + changes * mixing_bytes
+    total_seconds = files * file_seconds + pages * page_seconds + changes * mixing_seconds
+
+    for (cls, count) in classes.items():
+        (sticker_bytes, sticker_seconds) = _class_cost(cls, calibration)
+        total_bytes += count * sticker_bytes
+        total_seconds += count * sticker_seconds
+
+    return JobEstimate(sum(classes.values()), pages, round(total_bytes), total_seconds)
+
+def estimate_files(
+    files: Iterable[Sequence[Component | None]],
+    layout: PaperConfig,
+    calibration: Dict[str, Tuple[float, float]] | None = None,
+) -> JobEstimate:
+    # The same for a job which gets split into several files (split or roll
+    # output), each with its own fixed costs and its own last page
+    total = JobEstimate(0, 0, 0, 0.0)
+
+    for values in files:
+        part = estimate_job(values, layout, calibration)
+        total.stickers += part.stickers
+        total.pages += part.pages
+        total.bytes += part.bytes
+        total.seconds += part.seconds
+
+    return total
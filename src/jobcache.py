@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from src.paperconfig import PaperConfig
+from src.rendercontext import FONT_FILE
+
+from typing import Any, Sequence, TYPE_CHECKING
+
+import hashlib
+import os
+import shutil
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Bump this whenever a change to the drawing code changes the output, so that
+# previously cached files are not served for the new version.
+RENDER_VERSION = 1
+
+def _describe(value: Any) -> str:
+    # A stable textual description of a component (or anything else). Private
+    # attributes only hold caches, so they are left out.
+    if hasattr(value, "__dict__"):
+        fields = ", ".join(
+            f"{k}={_describe(v)}" for (k, v) in sorted(vars(value).items()) if not k.startswith("_"))
+        return f"{type(value).__name__}({fields})"
+
+    return repr(value)
+
+def job_hash(layout: PaperConfig, values: Sequence[Component | None], **options: Any) -> str:
+    # Hash of everything that ends up in the output: the components, the layout,
+    # the options, the palette, the font and the versions of the renderer
+    from reportlab import Version
+    from src.palette import get_palette
+
+    palette = get_palette()
+    h = hashlib.sha256()
+
+    h.update(f"render {RENDER_VERSION} reportlab {Version}\n".encode())
+    h.update(f"layout {_describe(layout)}\n".encode())
+    h.update(f"options {sorted(options.items())!r}\n".encode())
+    h.update(f"palette {palette.bands!r} {palette.gold!r} {palette.silver!r} {sorted(palette.leds.items())!r}\n".encode())
+
+    with open(FONT_FILE, "rb") as f:
+        h.update(hashlib.sha256(f.read()).digest())
+
+    for value in values:
+        h.update(_describe(value).encode())
+        h.update(b"\n")
+
+    return h.hexdigest()
+
+def value_hash(base: str, value: Component | None) -> str:
+    # Hash of a single component, on top of a job_hash() of everything else.
+    # Much cheaper than a job_hash() for every one of many components.
+    return hashlib.sha256(f"{base}\n{_describe(value)}".encode()).hexdigest()
+
+def write_hash_file(filename: str, digest: str) -> None:
+    with open(filename + ".sha256", "w", encoding="utf-8") as f:
+        f.write(digest + "\n")
+
+def read_hash_file(filename: str) -> str | None:
+    try:
+        with open(filename + ".sha256", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def fetch(cache_dir: str, digest: str, filename: str) -> bool:
+    # Copies a previously rendered file to `filename`, if there is one
+    cached = os.path.join(cache_dir, digest + ".pdf")
+    if not os.path.exists(cached):
+        return False
+
+    shutil.copyfile(cached, filename)
+    return True
+
+def store(cache_dir: str, digest: str, filename: str) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Copy under a temporary name first, so that a concurrent job never sees
+    # a half written file
+    cached = os.path.join(cache_dir, digest + ".pdf")
+    shutil.copyfile(filename, cached + ".tmp")
+    os.replace(cached + ".tmp", cached)
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from src.jobcache import value_hash
+from src.partcode import part_payload
+
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple, TYPE_CHECKING
+
+import pickle
+import sqlite3
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+    from src.main import RenderSummary
+    from src.paperconfig import PaperConfig
+
+# A record of every label that got printed: which job, page, row and column
+# it ended up on. Labels are looked up by the identity of their part, the same
+# text the QR codes carry (e.g. "resistor:4.7 kOhm"), so a scanned code can be
+# used as the query directly. The components themselves are told apart by a
+# hash of all their fields, as different parts may share the same text.
+#
+#   with Ledger("labels.sqlite") as ledger:
+#       log = ledger.begin_job("ComponentLabels.pdf", layout)
+#       render_stickers(c, layout, components, ..., ledger=log)
+#       log.close()
+#
+#       for record in ledger.find("resistor:4.7 kOhm"): print(record)
+
+# Stored in the user_version of the database, for telling older files apart
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    created TEXT NOT NULL,
+    layout BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS components (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    component BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS components_by_payload ON components (payload);
+
+CREATE TABLE IF NOT EXISTS labels (
+    job INTEGER NOT NULL REFERENCES jobs (id),
+    position INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    column INTEGER NOT NULL,
+    component INTEGER NOT NULL REFERENCES components (id),
+    PRIMARY KEY (job, position)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS labels_by_component ON labels (component, job, position);
+"""
+
+# Labels are written in batches of this many rows
+_BATCH_SIZE = 10000
+
+class LabelRecord:
+    def __init__(self, job: int, filename: str, created: str, position: int, page: int, row: int, column: int) -> None:
+        self.job = job
+        self.filename = filename
+        self.created = created
+        # All of these count from 0, like in render_stickers
+        self.position = position
+        self.page = page
+        self.row = row
+        self.column = column
+
+    def __str__(self) -> str:
+        return "job {} ({}, {}): page {}, row {}, column {}".format(
+            self.job, self.filename, self.created, self.page + 1, self.row + 1, self.column + 1)
+
+class JobLog:
+    # Collects the labels of one job. Written to the ledger in batches, and
+    # committed as a whole on close(), so that an aborted job leaves no trace.
+    def __init__(self, ledger: Ledger, job: int) -> None:
+        self.ledger = ledger
+        self.job = job
+        self._rows: List[Tuple[int, int, int, int, int, int]] = []
+
+    def record(self, position: int, page: int, row: int, column: int, component: Component) -> None:
+        self._rows.append((self.job, position, page, row, column, self.ledger.component_id(component)))
+        if len(self._rows) >= _BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self.ledger.connection.executemany("INSERT INTO labels VALUES (?, ?, ?, ?, ?, ?)", self._rows)
+        self._rows.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.ledger.connection.commit()
+
+class Ledger:
+    def __init__(self, filename: str) -> None:
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        tables = self.connection.execute("SELECT count(*) FROM sqlite_master WHERE name = 'components'").fetchone()[0]
+        if tables and version != _SCHEMA_VERSION:
+            raise ValueError(f"The ledger {filename} was written by another version, start a new one")
+
+        self.connection.executescript(_SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        # Ids of the components known to the ledger, by their key
+        self._component_ids: Dict[str, int] = {}
+
+    def __enter__(self) -> Ledger:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def begin_job(self, filename: str, layout: PaperConfig) -> JobLog:
+        cursor = self.connection.execute(
+            "INSERT INTO jobs (filename, created, layout) VALUES (?, ?, ?)",
+            (filename, datetime.now().isoformat(sep=" ", timespec="seconds"), pickle.dumps(layout)))
+        assert cursor.lastrowid is not None
+        return JobLog(self, cursor.lastrowid)
+
+    def component_id(self, component: Component) -> int:
+        # The class and all the fields of the component, the way the job cache sees it
+        key = value_hash("component", component)
+        component_id = self._component_ids.get(key)
+
+        if component_id is None:
+            row = self.connection.execute("SELECT id FROM components WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                # Kept whole, so that the label can be rendered again exactly
+                cursor = self.connection.execute(
+                    "INSERT INTO components (key, payload, component) VALUES (?, ?, ?)",
+                    (key, part_payload(component), pickle.dumps(component)))
+                assert cursor.lastrowid is not None
+                component_id = cursor.lastrowid
+            else:
+                component_id = row[0]
+            self._component_ids[key] = component_id
+
+        return component_id
+
+    def find(self, payload: str, job: int | None = None) -> List[LabelRecord]:
+        # All printed labels of the part, oldest job first
+        query = """
+            SELECT jobs.id, jobs.filename, jobs.created, labels.position, labels.page, labels.row, labels.column
+            FROM components
+            JOIN labels ON labels.component = components.id
+            JOIN jobs ON jobs.id = labels.job
+            WHERE components.payload = ?"""
+        parameters: Tuple[object, ...] = (payload,)
+
+        if job is not None:
+            query += " AND labels.job = ?"
+            parameters += (job,)
+
+        rows = self.connection.execute(query + " ORDER BY labels.job, labels.position", parameters)
+        return [LabelRecord(*row) for row in rows]
+
+    def job_layout(self, job: int) -> PaperConfig:
+        (blob,) = self.connection.execute("SELECT layout FROM jobs WHERE id = ?", (job,)).fetchone()
+        layout: PaperConfig = pickle.loads(blob)
+        return layout
+
+    def components(self, job: int, positions: Sequence[int]) -> Dict[int, Component]:
+        # The components printed at the given positions of the job
+        result = {}
+        for position in positions:
+            (blob,) = self.connection.execute(
+                "SELECT components.component FROM labels JOIN components ON components.id = labels.component "
+                "WHERE labels.job = ? AND labels.position = ?", (job, position)).fetchone()
+            result[position] = pickle.loads(blob)
+        return result
+
+def reprint_filename(basename: str, job: int) -> str:
+    return "{}-reprint-{}.pdf".format(basename, job)
+
+def reprint(
+    ledger: Ledger,
+    records: Sequence[LabelRecord],
+    basename: str,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    draw_codes: bool = False,
+) -> List[Tuple[str, RenderSummary]]:
+    # Renders the stickers of the records again, one file per job. Every
+    # sticker keeps its row and column, so that it can go onto a partly used
+    # sheet, and the pages without any of them are left out.
+    from src.main import create_canvas, register_fonts, render_stickers
+
+    register_fonts()
+    results = []
+
+    for job in sorted({record.job for record in records}):
+        layout = ledger.job_layout(job)
+        per_page = layout.num_stickers_horizontal * layout.num_stickers_vertical
+
+        positions = sorted(record.position for record in records if record.job == job)
+        components = ledger.components(job, positions)
+        pages = {page: number for (number, page) in enumerate(sorted({p // per_page for p in positions}))}
+
+        values: List[Component | None] = [None] * (len(pages) * per_page)
+        for position in positions:
+            values[pages[position // per_page] * per_page + position % per_page] = components[position]
+
+        filename = reprint_filename(basename, job)
+        c = create_canvas(filename, layout)
+        summary = render_stickers(c, layout, values, draw_outlines, draw_center_line, draw_codes=draw_codes)
+        c.save()
+
+        results.append((filename, summary))
+
+    return results
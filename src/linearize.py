@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+
+def linearize(filename: str, object_streams: bool = False, reproducible: bool = False) -> None:
+    # Rewrites a finished PDF as a linearized ("fast web view") file: the first
+    # page and a hint table come first, so viewers can show page one before
+    # the rest of the file has been downloaded. With `object_streams`, the
+    # objects and the cross-reference table get compressed as well, which
+    # makes the file noticeably smaller.
+    #
+    # reportlab cannot do this itself, so this needs the optional pikepdf
+    # (qpdf) library.
+    try:
+        import pikepdf
+    except ImportError:
+        raise RuntimeError("Linearized output needs pikepdf, install it with 'pip install pikepdf'") from None
+
+    mode = pikepdf.ObjectStreamMode.generate if object_streams else pikepdf.ObjectStreamMode.preserve
+
+    # Write next to the original first, so that a failure never leaves a
+    # half written file behind
+    temporary = filename + ".tmp"
+    with pikepdf.open(filename) as pdf:
+        pdf.save(temporary, linearize=True, object_stream_mode=mode, deterministic_id=reproducible)
+
+    os.replace(temporary, filename)
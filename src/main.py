@@ -1,23 +1,45 @@
-from reportlab.lib.colors import HexColor, black
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-from src.components.component import Component
-from src.components.resistor import Resistor
-from src.components.capacitor import Capacitor
-from src.components.transistor import NPNBJT, PNPBJT, NMOSFET, PMOSFET
-from src.components.diode import Diode, SchottkyDiode, ZenerDiode, LED
-from src.components.nut import SquareNut, HexNut, Washer
-from src.components.screw import RecessedHeadScrew, RoundHeadScrew, FlatHeadScrew
-from src.components.threadedinsert import ThreadedInsert
-from src.components.spring import CompressionSpring, ExtensionSpring
-from src.paperconfig import PaperConfig, AVERY_5260, AVERY_L7157, VYSOCINA
-from src.stickerrect import StickerRect
-
-from typing import List
+from __future__ import annotations
+
+from src.batchcanvas import BatchingCanvas
+from src.statecanvas import CanvasMark, StateTrackingCanvas
+from src.outputprofile import DEFAULT_PROFILE, PROFILES, apply_profile
+from src.paperconfig import PaperConfig, RollConfig, AVERY_5260, AVERY_L7157, VYSOCINA
+from src.rendercontext import DEFAULT_CONTEXT, RenderContext, register_font
+from src.stickerrect import StickerRect, page_transform
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, TYPE_CHECKING
+
+import os
+import sys
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.components.component import Component
+    from src.ledger import JobLog
+    from src.memprofile import MemoryProfiler
+
+def register_fonts() -> None:
+    # The font of DEFAULT_CONTEXT, for rendering on the main thread
+    register_font(DEFAULT_CONTEXT.font)
+
+def create_canvas(filename: str, layout: PaperConfig, reproducible: bool = False, profile: str = DEFAULT_PROFILE) -> Canvas:
+    from reportlab.pdfgen import canvas
+
+    # In invariant mode, reportlab uses a fixed creation date and derives the
+    # document ID from the content, so identical jobs give identical files
+    c = canvas.Canvas(filename, pagesize=layout.output_pagesize, invariant=1 if reproducible else 0)
+    apply_profile(c, profile)
+    return c
 
 def begin_page(c: Canvas, layout: PaperConfig, draw_outlines: bool) -> None:
+    # Rotate and/or mirror the whole page at once. showPage resets the
+    # transformation, so this is needed once for every page.
+    matrix = page_transform(layout)
+    if matrix is not None:
+        c.transform(*matrix)
+
     # Draw the outlines of the stickers. Not recommended for the actual print.
     if draw_outlines:
         render_outlines(c, layout)
@@ -25,13 +47,146 @@ def begin_page(c: Canvas, layout: PaperConfig, draw_outlines: bool) -> None:
 def end_page(c: Canvas) -> None:
     c.showPage()
 
+class StickerFailure:
+    def __init__(self, position: int, page: int, row: int, column: int, component: str, error: str) -> None:
+        # All of these count from 0, like in render_stickers
+        self.position = position
+        self.page = page
+        self.row = row
+        self.column = column
+        self.component = component
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    def __str__(self) -> str:
+        return "sticker {} ({}) on page {}, row {}, column {}: {}".format(
+            self.position, self.component, self.page + 1, self.row + 1, self.column + 1, self.error)
+
+class RenderSummary:
+    def __init__(self) -> None:
+        self.stickers = 0
+        self.pages = 0
+        self.elided_state_changes = 0
+        # Stickers which could not be drawn and got a placeholder instead
+        self.failures: List[StickerFailure] = []
+
+    def add(self, other: RenderSummary) -> None:
+        self.stickers += other.stickers
+        self.pages += other.pages
+        self.elided_state_changes += other.elided_state_changes
+        self.failures.extend(other.failures)
+
+    def __str__(self) -> str:
+        text = "{} stickers on {} pages, {} redundant state changes elided".format(
+            self.stickers, self.pages, self.elided_state_changes)
+        if self.failures:
+            text += ", {} stickers failed".format(len(self.failures))
+        return text
+
+def draw_placeholder(c: Canvas, rect: StickerRect, component: Component, ctx: RenderContext) -> None:
+    # Takes the place of a sticker which could not be drawn, so that it is
+    # easy to spot on the sheet and all the other stickers stay where they are
+    from reportlab.lib.colors import black
+
+    c.setStrokeColor(black, 0.5)
+    c.setLineWidth(0.5)
+    c.rect(rect.left, rect.bottom, rect.width, rect.height, stroke=1, fill=0)
+    c.line(rect.left, rect.bottom, rect.left + rect.width, rect.bottom + rect.height)
+    c.line(rect.left, rect.bottom + rect.height, rect.left + rect.width, rect.bottom)
+
+    c.setFillColor(black)
+    c.setFont(ctx.font, rect.height / 8)
+    c.drawCentredString(rect.left + rect.width / 2, rect.bottom + rect.height / 2 + rect.height / 24,
+                        "{} failed".format(type(component).__name__))
+
 def render_stickers(
     c: Canvas,
     layout: PaperConfig,
-    values: List[Component | None],
+    values: Iterable[Component | None],
     draw_outlines: bool,
     draw_center_line: bool,
-) -> None:
+    batch_paths: bool = True,
+    track_state: bool = True,
+    draw_codes: bool = False,
+    profiler: MemoryProfiler | None = None,
+    ledger: JobLog | None = None,
+    ctx: RenderContext = DEFAULT_CONTEXT,
+) -> RenderSummary:
+    # Everything the rendering depends on is passed in, so several threads can
+    # render at the same time, each with its own canvas and context
+    if profiler is not None:
+        with profiler.stage("render_stickers"):
+            return _render_stickers(c, layout, values, draw_outlines, draw_center_line,
+                                    batch_paths, track_state, draw_codes, profiler, ledger, ctx)
+
+    return _render_stickers(c, layout, values, draw_outlines, draw_center_line,
+                            batch_paths, track_state, draw_codes, None, ledger, ctx)
+
+def _tracking_canvas(c: Canvas, batch_paths: bool, track_state: bool) -> StateTrackingCanvas | None:
+    # Collect the many small line segments of the icons into larger paths.
+    # Batching always drops redundant state changes as well.
+    if batch_paths:
+        return BatchingCanvas(c)
+    if track_state:
+        return StateTrackingCanvas(c)
+    return None
+
+def _draw_sticker(
+    c: Canvas,
+    mark: CanvasMark,
+    layout: PaperConfig,
+    row: int,
+    column: int,
+    value: Component,
+    draw_center_line: bool,
+    draw_codes: bool,
+    profiler: MemoryProfiler | None,
+    ctx: RenderContext,
+) -> str | None:
+    # A component which fails to draw must not take the whole job down.
+    # Whatever it drew gets taken off the page again and a placeholder takes
+    # its place. Returns the error, None if the sticker got drawn.
+    try:
+        with StickerRect(c, layout, row, column, False) as rect:
+            if draw_codes:
+                from src.partcode import draw_part_code
+                rect = draw_part_code(c, rect, value)
+
+            if profiler is None:
+                value.draw(c, rect, draw_center_line, ctx)
+            else:
+                with profiler.stage(type(value).__name__ + ".draw"):
+                    value.draw(c, rect, draw_center_line, ctx)
+    except Exception as e:
+        mark.rollback()
+        with StickerRect(c, layout, row, column, False) as rect:
+            draw_placeholder(c, rect, value, ctx)
+        return repr(e)
+
+    mark.release()
+    return None
+
+def _render_stickers(
+    c: Canvas,
+    layout: PaperConfig,
+    values: Iterable[Component | None],
+    draw_outlines: bool,
+    draw_center_line: bool,
+    batch_paths: bool,
+    track_state: bool,
+    draw_codes: bool,
+    profiler: MemoryProfiler | None,
+    ledger: JobLog | None,
+    ctx: RenderContext,
+) -> RenderSummary:
+    summary = RenderSummary()
+
+    tracker = _tracking_canvas(c, batch_paths, track_state)
+    if tracker is not None:
+        c = tracker
+
     # Set the title
     c.setTitle(f"Resistor Labels - {layout.paper_name}")
 
@@ -45,16 +200,40 @@ def render_stickers(
         # If we are at the first sticker of a new page, change the page
         if rowId == 0 and columnId == 0 and position != 0:
             end_page(c)
+            summary.pages += 1
+            if profiler is not None:
+                profiler.page_done()
             begin_page(c, layout, draw_outlines)
 
-        if value is not None:
-            with StickerRect(c, layout, rowId, columnId, False) as rect:
-                value.draw(c, rect, draw_center_line)
+        if value is None:
+            continue
+
+        mark = tracker.mark() if tracker is not None else CanvasMark(c)
+        error = _draw_sticker(c, mark, layout, rowId, columnId, value, draw_center_line, draw_codes, profiler, ctx)
+
+        if error is not None:
+            summary.failures.append(StickerFailure(
+                position, summary.pages, rowId, columnId, type(value).__name__, error))
+            continue
+
+        summary.stickers += 1
+        if ledger is not None:
+            ledger.record(position, summary.pages, rowId, columnId, value)
 
     # End the page one final time
     end_page(c)
+    summary.pages += 1
+    if profiler is not None:
+        profiler.page_done()
+
+    if tracker is not None:
+        summary.elided_state_changes = tracker.elided_state_changes
+
+    return summary
 
 def render_outlines(c: Canvas, layout: PaperConfig) -> None:
+    from reportlab.lib.colors import black
+
     for row in range(layout.num_stickers_vertical):
         for column in range(layout.num_stickers_horizontal):
             with StickerRect(c, layout, row, column, False) as rect:
@@ -62,8 +241,403 @@ def render_outlines(c: Canvas, layout: PaperConfig) -> None:
                 c.setLineWidth(0)
                 c.roundRect(rect.left, rect.bottom, rect.width, rect.height, rect.corner)
 
+def parse_arguments(args: List[str] | None = None) -> Namespace:
+    from argparse import SUPPRESS, ArgumentParser
+    from src.paperconfig import ROTATIONS
+
+    parser = ArgumentParser(description="Generates labels for electronic components.")
+    parser.add_argument("--rotate", type=int, choices=ROTATIONS, default=0,
+                        help="rotate the pages counterclockwise by this many degrees")
+    parser.add_argument("--mirror", action="store_true",
+                        help="mirror the pages horizontally")
+    parser.add_argument("--estimate", action="store_true",
+                        help="only estimate the number of pages, the size and the render time of the job")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="track the memory allocated by the stages of the rendering and print a report")
+    parser.add_argument("--calibration", metavar="FILE",
+                        help="costs used by --estimate and max_bytes_per_file, measured on this machine and saved to FILE "
+                             "if it does not exist yet")
+    parser.add_argument("--decode", metavar="FILE",
+                        help="print the values of the SMD codes or colour bands in FILE (one per line, "
+                             "'-' for standard input) instead of generating labels")
+    parser.add_argument("--find-label", metavar="PART",
+                        help="list where the labels of PART (e.g. 'resistor:4.7 kOhm', as in the QR codes) "
+                             "were printed, according to the ledger")
+    parser.add_argument("--reprint", action="store_true",
+                        help="with --find-label, render those labels again at their rows and columns")
+    parser.add_argument("--verify", action="store_true",
+                        help="render the job in all the fast ways as well as the plain one and report "
+                             "the stickers which do not look the same")
+    parser.add_argument("--preview", action="store_true",
+                        help="write contact sheets of all stickers as PNG images instead of the PDF")
+    parser.add_argument("--output-profile", choices=list(PROFILES),
+                        help="how the PDF gets compressed, overrides output_profile")
+    # Roboto is the only font there is by now, the option is still accepted
+    # so that existing scripts (and CI) keep working
+    parser.add_argument("--roboto", action="store_true", help=SUPPRESS)
+
+    return parser.parse_args(args)
+
+class JobOptions(NamedTuple):
+    # The further configuration options of main(), handed on to the modes
+    draw_center_line: bool
+    draw_outlines: bool
+    palette_file: str | None
+    max_pages_per_file: int | None
+    max_bytes_per_file: int | None
+    split_by_group: bool
+    rerender_failed: bool
+    render_threads: bool
+    target_layouts: List[str] | None
+    roll_pages_per_file: int
+    draw_part_codes: bool
+    reproducible_output: bool
+    cache_dir: str | None
+    linearized_output: bool
+    object_streams: bool
+    zpl_output: str | None
+    zpl_dpi: int
+    decode_index_file: str
+    ledger_file: str | None
+    checkpoint_pages: int | None
+    output_profile: str
+    preview_cache_dir: str
+
+    def split_output(self) -> bool:
+        return self.max_pages_per_file is not None or self.max_bytes_per_file is not None or self.split_by_group
+
+def _decode_codes(filename: str, options: JobOptions) -> None:
+    from src.decode import load_index
+
+    index = load_index(options.decode_index_file)
+    with (sys.stdin if filename == "-" else open(filename, encoding="utf-8")) as f:
+        for (code, values) in index.decode_lines(f):
+            print("{}\t{}".format(code, "; ".join(map(str, values)) if values else "unknown"))
+
+def _find_label(part: str, reprint_labels: bool, options: JobOptions) -> None:
+    from src.ledger import Ledger, reprint
+
+    if options.ledger_file is None:
+        raise ValueError("--find-label needs a ledger_file to look in")
+
+    with Ledger(options.ledger_file) as lookup:
+        records = lookup.find(part)
+        for record in records:
+            print(record)
+        print("{} labels of '{}' found".format(len(records), part))
+
+        if reprint_labels and records:
+            for (filename, summary) in reprint(lookup, records, "ComponentLabels", options.draw_outlines,
+                                               options.draw_center_line, options.draw_part_codes):
+                print("{}: {}".format(filename, summary))
+
+def _estimate(
+    components: List[Component | None],
+    layout: PaperConfig,
+    calibration_file: str | None,
+    options: JobOptions,
+) -> None:
+    from src import estimate
+
+    if options.target_layouts is not None or options.zpl_output is not None:
+        raise ValueError("--estimate only covers PDF output onto `layout`, not target_layouts or zpl_output")
+
+    calibration = estimate.job_calibration(layout, options.output_profile, options.draw_part_codes,
+                                           options.draw_outlines, calibration_file)
+
+    # Every output file has fixed costs of its own
+    files: List[List[Component | None]] = [components]
+    if isinstance(layout, RollConfig):
+        per_file = options.roll_pages_per_file * layout.labels_across * layout.rows_per_page
+        files = [components[i:i + per_file] for i in range(0, len(components), per_file)]
+    elif options.split_output():
+        from src.outputplan import plan_output
+
+        files = [part.values for part in plan_output(components, layout, "ComponentLabels",
+                                                     options.max_pages_per_file, options.max_bytes_per_file,
+                                                     options.split_by_group, calibration)]
+
+    print("Estimated {}".format(estimate.estimate_files(files, layout, calibration)))
+
+def _verify(components: List[Component | None], layout: PaperConfig, options: JobOptions) -> None:
+    from src.equivalence import check_equivalence
+
+    differences = check_equivalence(components, layout, options.draw_outlines, options.draw_center_line,
+                                    paths=("state", "batched", "parts"))
+    for difference in differences:
+        print(difference)
+    print("{} of {} stickers differ from the reference rendering".format(len(differences), len(components)))
+
+def _preview(components: List[Component | None], layout: PaperConfig, options: JobOptions) -> None:
+    from src.preview import render_preview
+
+    preview = render_preview(components, layout, "ComponentLabels", options.draw_center_line,
+                             options.preview_cache_dir, draw_codes=options.draw_part_codes)
+    for filename in preview.sheets:
+        print(filename)
+    print("Preview of {}".format(preview))
+
+def _send_zpl(components: List[Component | None], layout: PaperConfig, zpl_output: str, options: JobOptions) -> None:
+    from src.zpl import zpl_labels, send_zpl, write_zpl
+
+    labels = zpl_labels(components, layout, options.draw_center_line, options.zpl_dpi, options.draw_part_codes)
+    (host, _, port) = zpl_output.rpartition(":")
+    if host and port.isdigit():
+        count = send_zpl(labels, host, int(port))
+    else:
+        with open(zpl_output, "wb") as f:
+            count = write_zpl(labels, f)
+    print("Sent {} labels to {}".format(count, zpl_output))
+
+def _render_target_layouts(
+    components: List[Component | None],
+    target_layouts: List[str],
+    arguments: Namespace,
+    options: JobOptions,
+) -> None:
+    from src.multilayout import render_layouts, layout_files
+
+    summaries = render_layouts(components, target_layouts, "ComponentLabels",
+                               options.draw_outlines, options.draw_center_line,
+                               palette_file=options.palette_file, reproducible=options.reproducible_output,
+                               rotation=arguments.rotate, mirror=arguments.mirror,
+                               linearized=options.linearized_output, object_streams=options.object_streams,
+                               draw_codes=options.draw_part_codes, profile=options.output_profile,
+                               roll_pages_per_file=options.roll_pages_per_file)
+    for (name, summary) in summaries.items():
+        print("{}: {}".format(layout_files("ComponentLabels", name), summary))
+
+def _render_roll(components: List[Component | None], layout: RollConfig, options: JobOptions) -> None:
+    from src.roll import render_roll
+
+    for (filename, summary) in render_roll(components, layout, "ComponentLabels",
+                                           options.draw_outlines, options.draw_center_line,
+                                           options.roll_pages_per_file, options.reproducible_output,
+                                           options.draw_part_codes, options.output_profile):
+        print("{}: {}".format(filename, summary))
+
+def _render_split(
+    components: List[Component | None],
+    layout: PaperConfig,
+    calibration_file: str | None,
+    options: JobOptions,
+) -> None:
+    from src.estimate import job_calibration
+    from src.outputplan import plan_output, render_plan, failed_parts
+
+    # The byte budget is planned with the costs of these options
+    calibration = None
+    if options.max_bytes_per_file is not None:
+        calibration = job_calibration(layout, options.output_profile, options.draw_part_codes,
+                                      options.draw_outlines, calibration_file)
+
+    manifest_file = "ComponentLabels.json"
+    parts = plan_output(components, layout, "ComponentLabels", options.max_pages_per_file,
+                        options.max_bytes_per_file, options.split_by_group, calibration)
+    only = failed_parts(manifest_file) if options.rerender_failed else None
+
+    for entry in render_plan(parts, layout, options.draw_outlines, options.draw_center_line,
+                             manifest_file, palette_file=options.palette_file, only=only,
+                             reproducible=options.reproducible_output,
+                             linearized=options.linearized_output, object_streams=options.object_streams,
+                             draw_codes=options.draw_part_codes, threads=options.render_threads,
+                             profile=options.output_profile, max_bytes=options.max_bytes_per_file):
+        print("{}: {}".format(entry["filename"], entry["status"]))
+
+def _run_lookup(arguments: Namespace, options: JobOptions) -> bool:
+    # The modes which look something up instead of generating labels
+    if arguments.decode is not None:
+        _decode_codes(arguments.decode, options)
+    elif arguments.find_label is not None:
+        _find_label(arguments.find_label, arguments.reprint, options)
+    else:
+        return False
+    return True
+
+def _run_inspection(
+    arguments: Namespace,
+    components: List[Component | None],
+    layout: PaperConfig,
+    options: JobOptions,
+) -> bool:
+    # The modes which tell something about the job instead of printing it
+    if arguments.estimate:
+        _estimate(components, layout, arguments.calibration, options)
+    elif arguments.verify:
+        _verify(components, layout, options)
+    elif arguments.preview:
+        _preview(components, layout, options)
+    else:
+        return False
+    return True
+
+def _run_other_output(
+    arguments: Namespace,
+    components: List[Component | None],
+    layout: PaperConfig,
+    options: JobOptions,
+) -> bool:
+    # The outputs other than a single PDF
+    if options.zpl_output is not None:
+        _send_zpl(components, layout, options.zpl_output, options)
+    elif options.target_layouts is not None:
+        _render_target_layouts(components, options.target_layouts, arguments, options)
+    elif isinstance(layout, RollConfig):
+        _render_roll(components, layout, options)
+    elif options.split_output():
+        _render_split(components, layout, arguments.calibration, options)
+    else:
+        return False
+    return True
+
+def _reuse_output(output_file: str, digest: str, options: JobOptions) -> bool:
+    # Whether the PDF of a reproducible job is already there or in the cache.
+    # A job which goes into the ledger is always rendered, so that its labels
+    # get recorded.
+    from src import jobcache
+
+    if options.ledger_file is not None:
+        return False
+
+    if os.path.exists(output_file) and jobcache.read_hash_file(output_file) == digest:
+        print("{} is up to date".format(output_file))
+        return True
+
+    if options.cache_dir is not None and jobcache.fetch(options.cache_dir, digest, output_file):
+        jobcache.write_hash_file(output_file, digest)
+        print("{} served from the cache".format(output_file))
+        return True
+
+    return False
+
+def _render_checkpoint(
+    components: List[Component | None],
+    layout: PaperConfig,
+    output_file: str,
+    checkpoint_pages: int,
+    arguments: Namespace,
+    options: JobOptions,
+) -> RenderSummary:
+    from src.checkpoint import render_checkpointed
+
+    if options.ledger_file is not None:
+        raise ValueError("ledger_file cannot be combined with checkpoint_pages, the labels would not be recorded")
+    if arguments.profile_memory:
+        raise ValueError("--profile-memory cannot be combined with checkpoint_pages")
+
+    summary = render_checkpointed(components, layout, output_file, options.draw_outlines, options.draw_center_line,
+                                  checkpoint_pages, options.reproducible_output, options.draw_part_codes,
+                                  options.output_profile)
+
+    if options.linearized_output:
+        from src.linearize import linearize
+        linearize(output_file, options.object_streams, options.reproducible_output)
+
+    return summary
+
+def _render_canvas(
+    components: List[Component | None],
+    layout: PaperConfig,
+    output_file: str,
+    arguments: Namespace,
+    options: JobOptions,
+) -> Tuple[RenderSummary, MemoryProfiler | None]:
+    from src.ledger import Ledger
+
+    profiler: MemoryProfiler | None = None
+    ledger: Ledger | None = None
+    job_log: JobLog | None = None
+
+    if arguments.profile_memory:
+        from src.memprofile import MemoryProfiler
+
+        profiler = MemoryProfiler()
+        profiler.start()
+
+    # Create the render canvas
+    register_fonts()
+    c = create_canvas(output_file, layout, options.reproducible_output, options.output_profile)
+
+    if options.ledger_file is not None:
+        ledger = Ledger(options.ledger_file)
+        job_log = ledger.begin_job(output_file, layout)
+
+    # Render the stickers
+    summary = render_stickers(c, layout, components, options.draw_outlines, options.draw_center_line,
+                              draw_codes=options.draw_part_codes, profiler=profiler, ledger=job_log)
+
+    # Store canvas to PDF file
+    if profiler is not None:
+        with profiler.stage("Canvas.save"):
+            c.save()
+        profiler.stop()
+    else:
+        c.save()
+
+    if options.linearized_output:
+        from src.linearize import linearize
+        linearize(output_file, options.object_streams, options.reproducible_output)
+
+    # Only recorded once the file has actually been written
+    if ledger is not None and job_log is not None:
+        job_log.close()
+        ledger.close()
+
+    return (summary, profiler)
+
+def _render_pdf(
+    components: List[Component | None],
+    layout: PaperConfig,
+    arguments: Namespace,
+    options: JobOptions,
+) -> None:
+    from src import jobcache
+
+    output_file = "ComponentLabels.pdf"
+    digest: str | None = None
+
+    if options.reproducible_output:
+        digest = jobcache.job_hash(layout, components,
+                                   draw_outlines=options.draw_outlines, draw_center_line=options.draw_center_line,
+                                   draw_codes=options.draw_part_codes, profile=options.output_profile,
+                                   linearized=options.linearized_output, object_streams=options.object_streams)
+        if _reuse_output(output_file, digest, options):
+            return
+
+    profiler: MemoryProfiler | None = None
+    if options.checkpoint_pages is not None:
+        summary = _render_checkpoint(components, layout, output_file, options.checkpoint_pages, arguments, options)
+    else:
+        (summary, profiler) = _render_canvas(components, layout, output_file, arguments, options)
+
+    if digest is not None:
+        jobcache.write_hash_file(output_file, digest)
+        if options.cache_dir is not None:
+            jobcache.store(options.cache_dir, digest, output_file)
+
+    print("Generated {}".format(summary))
+
+    # The failed stickers have a placeholder in the PDF, this tells why
+    for failure in summary.failures:
+        print("Failed: {}".format(failure))
+
+    if profiler is not None:
+        print(profiler.report())
+
 def main() -> None:
-    pdfmetrics.registerFont(TTFont('main', 'Roboto-Bold.ttf'))
+    # The component classes are imported here rather than at module level, so
+    # that importing this module (e.g. just for `render_stickers`) stays cheap.
+    from src.components.resistor import Resistor
+    from src.components.capacitor import Capacitor
+    from src.components.transistor import NPNBJT, PNPBJT, NMOSFET, PMOSFET
+    from src.components.diode import Diode, SchottkyDiode, ZenerDiode, LED
+    from src.components.nut import SquareNut, HexNut, Washer
+    from src.components.screw import RecessedHeadScrew, RoundHeadScrew, FlatHeadScrew
+    from src.components.threadedinsert import ThreadedInsert
+    from src.components.spring import CompressionSpring, ExtensionSpring
+    from src.palette import load_palette, use_palette
+
+    arguments = parse_arguments()
 
     # ############################################################################
     # Select the correct type of paper you want to print on.
@@ -71,6 +645,7 @@ def main() -> None:
     layout = VYSOCINA
     # layout = AVERY_L7157
     # layout = EJ_RANGE_24
+    # layout = ROLL_62MM
 
     # ############################################################################
     # Put your own component values in here!
@@ -84,18 +659,19 @@ def main() -> None:
 
     components.append(Resistor(0))
 
-    common_resistor_values: List[float] = [
-        # E6
-        # 1, 1.5, 2.2, 3.3, 4.7, 6.8
-
-        # E12
-        # 1, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2
+    # Complete E series (E3 up to E192) are available from src/eseries.py,
+    # e.g. all E24 values from 1 Ohm to 100 kOhms (exclusive):
+    #
+    # from src.eseries import resistors, capacitors
+    # components.extend(resistors("E24", 1, 100000))
+    #
+    # Capacitors work the same way, with the values in farads:
+    #
+    # components.extend(capacitors("E6", 10e-12, 1e-6))
 
+    common_resistor_values: List[float] = [
         # Mostly complete E24. The bundle of resistors I bought did not come with some.
         1, 1.2, 1.5, 1.8, 2, 2.2, 2.4, 2.7, 3, 3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1
-
-        # E24
-        # 1, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2, 2.2, 2.4, 2.7, 3, 3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1
     ]
     
     for exponent in range(6): # Ohms to 100kOhms (exclusive)
@@ -176,18 +752,18 @@ def main() -> None:
 
     # Diodes that emit light
 
-    components.append(LED("5 mm", "1.2 V", "20 mA", "940 nm", HexColor("#800000")))
-    components.append(LED("5 mm", "3.0-3.2 V", "20 mA", "* nm", HexColor("#FFFFFF")))
-    components.append(LED("5 mm", "1.9-2.1 V", "20 mA", "620-625 nm", HexColor("#FF0000")))
-    components.append(LED("5 mm", "1.9-2.1 V", "20 mA", "588-590 nm", HexColor("#FFFF00")))
-    components.append(LED("5 mm", "2.1-3.0 V", "20 mA", "567-570 nm", HexColor("#00FF00")))
-    components.append(LED("5 mm", "3.0-3.2 V", "20 mA", "455-465 nm", HexColor("#0000FF")))
-
-    components.append(LED("3 mm", "3.0-3.2 V", "20 mA", "* nm", HexColor("#FFFFFF")))
-    components.append(LED("3 mm", "1.9-2.1 V", "20 mA", "620-625 nm", HexColor("#FF0000")))
-    components.append(LED("3 mm", "1.9-2.1 V", "20 mA", "588-590 nm", HexColor("#FFFF00")))
-    components.append(LED("3 mm", "2.1-3.0 V", "20 mA", "567-570 nm", HexColor("#00FF00")))
-    components.append(LED("3 mm", "3.0-3.2 V", "20 mA", "455-465 nm", HexColor("#0000FF")))
+    components.append(LED("5 mm", "1.2 V", "20 mA", "940 nm", "infrared"))
+    components.append(LED("5 mm", "3.0-3.2 V", "20 mA", "* nm", "white"))
+    components.append(LED("5 mm", "1.9-2.1 V", "20 mA", "620-625 nm", "red"))
+    components.append(LED("5 mm", "1.9-2.1 V", "20 mA", "588-590 nm", "yellow"))
+    components.append(LED("5 mm", "2.1-3.0 V", "20 mA", "567-570 nm", "green"))
+    components.append(LED("5 mm", "3.0-3.2 V", "20 mA", "455-465 nm", "blue"))
+
+    components.append(LED("3 mm", "3.0-3.2 V", "20 mA", "* nm", "white"))
+    components.append(LED("3 mm", "1.9-2.1 V", "20 mA", "620-625 nm", "red"))
+    components.append(LED("3 mm", "1.9-2.1 V", "20 mA", "588-590 nm", "yellow"))
+    components.append(LED("3 mm", "2.1-3.0 V", "20 mA", "567-570 nm", "green"))
+    components.append(LED("3 mm", "3.0-3.2 V", "20 mA", "455-465 nm", "blue"))
     
     # Springs
 
@@ -309,7 +885,7 @@ def main() -> None:
 
     # These labels are useful for "random garbage" bags
 
-    components.append(LED("???", "??? V", "??? mA", "??? nm", HexColor("#FFC0C0")))
+    components.append(LED("???", "??? V", "??? mA", "??? nm", "unknown"))
     components.append(Diode("???", "? V", "??? mA", "??? V"))
     components.append(NPNBJT("???", "?", "?", "?", "??? V", "??? A", "??? V"))
 
@@ -328,6 +904,96 @@ def main() -> None:
     # for the actual printing.
     draw_outlines = False
 
+    # Load the colours of the color codes and LEDs from a JSON file instead of
+    # using the built-in ones (e.g. colours calibrated for a specific printer).
+    # See src/palette.py for the format.
+    palette_file = None
+
+    # Split the job into several PDF files, e.g. when the print server cannot
+    # handle huge files. Limit the number of pages and/or the size of every
+    # file (parts which come out larger than planned get split again), or
+    # put each component group (resistors, capacitors, semiconductors,
+    # hardware) into its own files. The parts are rendered in parallel and
+    # listed in ComponentLabels.json. To re-render only the parts
+    # which failed (or had stickers that failed) last time, set
+    # `rerender_failed`. With `render_threads`, the parts are rendered by
+    # threads instead of processes, which only pays off on free-threaded
+    # Python (3.13t and later).
+    max_pages_per_file: int | None = None
+    max_bytes_per_file: int | None = None
+    split_by_group = False
+    rerender_failed = False
+    render_threads = False
+
+    # Render the components onto several kinds of paper at once, e.g.
+    # ["VYSOCINA", "AVERY_5260"]. This writes one ComponentLabels-<layout>.pdf
+    # per preset (see LAYOUTS in src/paperconfig.py) instead of using `layout`.
+    target_layouts: List[str] | None = None
+
+    # Roll media (see RollConfig in src/paperconfig.py) has no fixed number of
+    # pages. The roll gets written as ComponentLabels-0001.pdf, -0002.pdf, ...
+    # with at most this many pages each, so that long jobs do not pile up in
+    # memory.
+    roll_pages_per_file = 500
+
+    # Add a QR code identifying the part (e.g. "resistor:4.7 kOhm") to both
+    # halves of every sticker, for scanning the bags. The regular contents get
+    # a bit narrower to make room for it.
+    draw_part_codes = False
+
+    # Produce byte-for-byte identical PDFs for identical jobs (fixed creation
+    # date and document ID). A hash of the job input is written next to the
+    # PDF, and the rendering is skipped if the PDF is already up to date. With
+    # `cache_dir`, finished PDFs are kept there under their hash and are reused
+    # for any repeated job.
+    reproducible_output = False
+    cache_dir: str | None = None
+
+    # Write linearized ("fast web view") PDFs, which viewers can start showing
+    # before the whole file has been downloaded, e.g. from a network share.
+    # `object_streams` additionally compresses the PDF structure, for smaller
+    # files. Both need the pikepdf library.
+    linearized_output = False
+    object_streams = False
+
+    # Print on a roll-fed thermal printer instead of generating a PDF. The
+    # labels are converted to ZPL and streamed while they are generated, either
+    # into a file or straight to a network printer ("host:port", usually port
+    # 9100). The labels keep the sticker size of `layout`.
+    zpl_output: str | None = None
+    zpl_dpi = 203
+
+    # The index used by --decode to look the values of SMD codes and colour
+    # bands up. It is built on first use and rebuilt when the encoding changes.
+    decode_index_file = ".decode-index.json"
+
+    # Record every printed label (job, page, row, column) in this SQLite file,
+    # so that --find-label can tell where a label is when it needs a reprint.
+    # Only used when the labels go into a single PDF, and not together with
+    # `checkpoint_pages`. A job recorded here is always rendered, even when an
+    # up to date PDF exists or the cache has it.
+    ledger_file: str | None = None
+
+    # Render the PDF in segments of this many pages and note every finished one
+    # in ComponentLabels.pdf.checkpoint.json. A job which gets interrupted goes
+    # on after the last finished segment when it is run again. The segments
+    # are joined at the end, which needs the pikepdf library. Not together with
+    # `ledger_file` or --profile-memory.
+    checkpoint_pages: int | None = None
+
+    # How the PDF gets written (see src/outputprofile.py): "default" as
+    # reportlab does it, "none" uncompressed (quick to write, easy to read,
+    # for previews), "fast" with the quickest compression, or "max" with the
+    # strongest compression and coordinates rounded to 1/100 pt (for
+    # archiving and sending over the network). --output-profile overrides it.
+    output_profile = DEFAULT_PROFILE
+
+    # --preview writes small images of the stickers onto contact sheets
+    # (ComponentLabels-preview-001.png, ...) for looking through the job
+    # before printing it. The thumbnail of every distinct component is kept
+    # in this directory, so only the changed ones get drawn again next time.
+    preview_cache_dir = ".preview-cache"
+
     # ############################################################################
     # PDF generation
     #
@@ -335,12 +1001,44 @@ def main() -> None:
     # the ComponentLabels PDF file.
     # ############################################################################
 
-    # Create the render canvas
-    c = Canvas("ComponentLabels.pdf", pagesize=layout.pagesize)
-
-    # Render the stickers
-    render_stickers(c, layout, components, draw_outlines, draw_center_line)
-
-    # Store canvas to PDF file
-    c.save()
-
+    options = JobOptions(
+        draw_center_line=draw_center_line,
+        draw_outlines=draw_outlines,
+        palette_file=palette_file,
+        max_pages_per_file=max_pages_per_file,
+        max_bytes_per_file=max_bytes_per_file,
+        split_by_group=split_by_group,
+        rerender_failed=rerender_failed,
+        render_threads=render_threads,
+        target_layouts=target_layouts,
+        roll_pages_per_file=roll_pages_per_file,
+        draw_part_codes=draw_part_codes,
+        reproducible_output=reproducible_output,
+        cache_dir=cache_dir,
+        linearized_output=linearized_output,
+        object_streams=object_streams,
+        zpl_output=zpl_output,
+        zpl_dpi=zpl_dpi,
+        decode_index_file=decode_index_file,
+        ledger_file=ledger_file,
+        checkpoint_pages=checkpoint_pages,
+        output_profile=arguments.output_profile or output_profile,
+        preview_cache_dir=preview_cache_dir,
+    )
+
+    if _run_lookup(arguments, options):
+        return
+
+    if palette_file is not None:
+        use_palette(load_palette(palette_file))
+
+    if arguments.rotate or arguments.mirror:
+        layout = layout.with_orientation(arguments.rotate, arguments.mirror)
+
+    if _run_inspection(arguments, components, layout, options):
+        return
+
+    if _run_other_output(arguments, components, layout, options):
+        return
+
+    _render_pdf(components, layout, arguments, options)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import sys
+import tracemalloc
+
+# tracemalloc.reset_peak() only exists from Python 3.9 on. Without it, the peaks
+# of the stages which stay below the peak of the whole job are underestimated.
+_CAN_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+class StageStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        # Memory still allocated after the stage, summed over all calls
+        self.retained = 0
+        # Highest allocation above the start of any single call
+        self.peak = 0
+
+class MemoryProfiler:
+    # Tracks the memory allocated in the stages of a job (the whole render,
+    # the drawing of every component class, saving the canvas) and after every
+    # page, using tracemalloc. Slows the rendering down noticeably, so it is
+    # only used when asked for.
+    #
+    #   profiler = MemoryProfiler()
+    #   profiler.start()
+    #   with profiler.stage("render_stickers"): ...
+    #   profiler.stop()
+    #   print(profiler.report())
+
+    def __init__(self, top_sites: int = 10) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        # Memory allocated after each page, in page order
+        self.pages: List[int] = []
+        self._top_sites = top_sites
+        # Peak of every stage that is currently running, innermost last
+        self._running: List[int] = []
+        self._start: tracemalloc.Snapshot | None = None
+        self._end: tracemalloc.Snapshot | None = None
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self._start = tracemalloc.take_snapshot()
+
+    def stop(self) -> None:
+        self._end = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        (start, peak) = tracemalloc.get_traced_memory()
+
+        if _CAN_RESET_PEAK:
+            # tracemalloc only keeps a single peak, so it is reset for every
+            # stage and the peaks get handed on to the enclosing stages by hand
+            if self._running:
+                self._running[-1] = max(self._running[-1], peak)
+            tracemalloc.reset_peak()
+            self._running.append(start)
+        else:
+            # Only the peak of the whole job is known. If it rises during the
+            # stage, that is the peak of the stage, otherwise the memory at the
+            # end of the stage has to do.
+            self._running.append(peak)
+
+        try:
+            yield
+        finally:
+            (end, peak) = tracemalloc.get_traced_memory()
+            before = self._running.pop()
+
+            if _CAN_RESET_PEAK:
+                peak = max(peak, before)
+                if self._running:
+                    self._running[-1] = max(self._running[-1], peak)
+                tracemalloc.reset_peak()
+            elif peak <= before:
+                peak = max(start, end)
+
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.retained += end - start
+            stats.peak = max(stats.peak, peak - start)
+
+    def page_done(self) -> None:
+        self.pages.append(tracemalloc.get_traced_memory()[0])
+
+    def report(self) -> str:
+        lines = ["{:<32} {:>8} {:>14} {:>12} {:>14}".format(
+            "stage", "calls", "retained [kB]", "peak [kB]", "per call [B]")]
+
+        if not _CAN_RESET_PEAK:
+            lines.insert(0, "Python {}.{} cannot reset the peak, the peaks of the stages are lower bounds".format(
+                *sys.version_info[:2]))
+
+        for (name, stats) in sorted(self.stages.items(), key=lambda item: -item[1].peak):
+            lines.append("{:<32} {:>8} {:>14.1f} {:>12.1f} {:>14.0f}".format(
+                name, stats.calls, stats.retained / 1024, stats.peak / 1024, stats.retained / stats.calls))
+
+        if len(self.pages) > 1:
+            # A job whose memory stays bounded grows by (close to) nothing per page
+            growth = (self.pages[-1] - self.pages[0]) / (len(self.pages) - 1)
+            lines.append("")
+            lines.append("{} pages, allocated after the first {:.1f} kB, after the last {:.1f} kB, "
+                         "{:.1f} kB more per page".format(
+                             len(self.pages), self.pages[0] / 1024, self.pages[-1] / 1024, growth / 1024))
+
+        if self._start is not None and self._end is not None:
+            lines.append("")
+            lines.append("Largest growth by allocation site:")
+            # Leave out what tracemalloc itself allocated
+            own = (tracemalloc.Filter(False, tracemalloc.__file__),)
+            end = self._end.filter_traces(own)
+            start = self._start.filter_traces(own)
+            for difference in end.compare_to(start, "lineno")[:self._top_sites]:
+                lines.append("  {}".format(difference))
+
+        return "\n".join(lines)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from src.main import RenderSummary
+from src.outputplan import OutputPart, render_part
+from src.outputprofile import DEFAULT_PROFILE
+from src.paperconfig import LAYOUTS, RollConfig
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+def prepare_components(values: Sequence[Component | None]) -> None:
+    # Computes the layout-independent parts (formatted values, SMD and EIA
+    # codes) once in this process. They are sent along to every worker, so
+    # the workers only have to do the actual drawing.
+    for value in values:
+        if value is not None:
+            value.prepare()
+
+def layout_filename(basename: str, layout_name: str) -> str:
+    return "{}-{}.pdf".format(basename, layout_name)
+
+def layout_files(basename: str, layout_name: str) -> str:
+    # The file a preset gets written to, or the pattern of the numbered files
+    # of a roll preset, for the messages
+    if isinstance(LAYOUTS[layout_name], RollConfig):
+        return "{}-{}-*.pdf".format(basename, layout_name)
+    return layout_filename(basename, layout_name)
+
+def render_roll_layout(
+    values: Sequence[Component | None],
+    layout: RollConfig,
+    basename: str,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    pages_per_file: int,
+    palette_file: str | None = None,
+    reproducible: bool = False,
+    draw_codes: bool = False,
+    profile: str = DEFAULT_PROFILE,
+) -> RenderSummary:
+    # Runs in a worker process like render_part, but a roll preset goes
+    # through render_roll, which cuts the roll into files of `pages_per_file`
+    # pages instead of keeping all of it in one document
+    from src.roll import render_roll
+
+    if palette_file is not None:
+        from src.palette import load_palette, use_palette
+        use_palette(load_palette(palette_file))
+
+    summary = RenderSummary()
+    for (_, part) in render_roll(values, layout, basename, draw_outlines, draw_center_line,
+                                 pages_per_file, reproducible, draw_codes, profile):
+        summary.add(part)
+    return summary
+
+def render_layouts(
+    values: Sequence[Component | None],
+    layout_names: Sequence[str],
+    basename: str,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    jobs: int | None = None,
+    palette_file: str | None = None,
+    reproducible: bool = False,
+    rotation: int = 0,
+    mirror: bool = False,
+    linearized: bool = False,
+    object_streams: bool = False,
+    draw_codes: bool = False,
+    profile: str = DEFAULT_PROFILE,
+    roll_pages_per_file: int = 500,
+) -> Dict[str, RenderSummary]:
+    # Renders the same components onto several paper presets (names from
+    # LAYOUTS) at once, one file and one worker process per preset. Roll
+    # presets are written as numbered files of `roll_pages_per_file` pages,
+    # the same as a job on roll media alone.
+    for name in layout_names:
+        if name not in LAYOUTS:
+            raise KeyError(f"Unknown layout '{name}', use one of {', '.join(LAYOUTS)}")
+
+    prepare_components(values)
+
+    positions = list(range(len(values)))
+    parts: List[OutputPart] = [
+        OutputPart(index, layout_filename(basename, name), None, positions, list(values))
+        for (index, name) in enumerate(layout_names)
+    ]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures: List[Future[RenderSummary]] = []
+        for (part, name) in zip(parts, layout_names):
+            layout = LAYOUTS[name].with_orientation(rotation, mirror)
+
+            if isinstance(layout, RollConfig):
+                futures.append(pool.submit(render_roll_layout, part.values, layout, "{}-{}".format(basename, name),
+                                           draw_outlines, draw_center_line, roll_pages_per_file,
+                                           palette_file, reproducible, draw_codes, profile))
+            else:
+                futures.append(pool.submit(render_part, part, layout, draw_outlines, draw_center_line,
+                                           palette_file, reproducible, linearized, object_streams, draw_codes,
+                                           False, profile))
+
+        return {name: future.result() for (name, future) in zip(layout_names, futures)}
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from src.components.registry import get_type_name
+from src.main import RenderSummary, create_canvas, register_fonts, render_stickers
+from src.outputprofile import DEFAULT_PROFILE
+from src.rendercontext import DEFAULT_CONTEXT
+from src.paperconfig import PaperConfig
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple, TYPE_CHECKING
+
+import json
+import os
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Output files the component types end up in when splitting by group
+COMPONENT_GROUPS: Dict[str, str] = {
+    "resistor": "resistors",
+    "capacitor": "capacitors",
+    "BJT": "semiconductors",
+    "FET": "semiconductors",
+    "diode": "semiconductors",
+    "LED": "semiconductors",
+    "nut": "hardware",
+    "washer": "hardware",
+    "screw": "hardware",
+    "insert": "hardware",
+    "spring": "hardware",
+}
+
+# The size estimates are within a few percent of the real files. The parts
+# are planned with this much of the byte budget, so that parts which come out
+# too large and have to be split again after rendering stay the exception.
+BYTE_BUDGET_MARGIN = 0.95
+
+class OutputPart:
+    def __init__(
+        self,
+        index: int,
+        filename: str,
+        group: str | None,
+        positions: List[int],
+        values: List[Component | None],
+    ) -> None:
+        self.index = index
+        self.filename = filename
+        self.group = group
+        # Positions of the values in the original component list
+        self.positions = positions
+        self.values = values
+
+def stickers_per_page(layout: PaperConfig) -> int:
+    return layout.num_stickers_horizontal * layout.num_stickers_vertical
+
+def _split_pages(
+    values: Sequence[Component | None],
+    positions: List[int],
+    layout: PaperConfig,
+    max_pages: int | None,
+    max_bytes: int | None,
+    calibration: Dict[str, Tuple[float, float]] | None,
+) -> List[List[int]]:
+    # Cuts the positions into files of whole pages, each within `max_pages`
+    # pages and the estimated size within `max_bytes`. Every file gets at
+    # least one page, even if that alone is over the budget.
+    from src.estimate import DEFAULT_CALIBRATION, estimate_job
+
+    if calibration is None:
+        calibration = DEFAULT_CALIBRATION
+
+    per_page = stickers_per_page(layout)
+    file_bytes = calibration["file"][0]
+    budget = max_bytes * BYTE_BUDGET_MARGIN if max_bytes is not None else None
+
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    (pages, size) = (0, file_bytes)
+
+    for start in range(0, len(positions), per_page):
+        page = positions[start:start + per_page]
+        page_bytes = estimate_job([values[p] for p in page], layout, calibration).bytes - file_bytes
+
+        too_long = max_pages is not None and pages >= max_pages
+        too_large = budget is not None and size + page_bytes > budget
+        if current and (too_long or too_large):
+            chunks.append(current)
+            (current, pages, size) = ([], 0, file_bytes)
+
+        current += page
+        pages += 1
+        size += page_bytes
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+def group_name(component: Component) -> str:
+    return COMPONENT_GROUPS[get_type_name(component)]
+
+def plan_output(
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    basename: str = "ComponentLabels",
+    max_pages: int | None = None,
+    max_bytes: int | None = None,
+    by_group: bool = False,
+    calibration: Dict[str, Tuple[float, float]] | None = None,
+) -> List[OutputPart]:
+    # The sizes for `max_bytes` are estimated with `calibration` (see
+    # src/estimate.py), which has to match the output profile, part codes
+    # and outlines of the job. The built-in costs are those of the default
+    # profile without either.
+    groups: List[Tuple[str | None, List[int]]] = []
+
+    if by_group:
+        # Padding (None) only makes sense within the original sheet layout, so
+        # it is dropped when the components get regrouped
+        indices: Dict[str, List[int]] = {}
+        for (position, value) in enumerate(values):
+            if value is not None:
+                indices.setdefault(group_name(value), []).append(position)
+        groups = list(indices.items())
+    else:
+        groups = [(None, list(range(len(values))))]
+
+    parts: List[OutputPart] = []
+    for (group, positions) in groups:
+        if max_pages is None and max_bytes is None:
+            chunks = [positions] if positions else []
+        else:
+            chunks = _split_pages(values, positions, layout, max_pages, max_bytes, calibration)
+
+        for (number, chunk) in enumerate(chunks):
+            name = basename
+            if group is not None:
+                name += "-" + group
+            if len(chunks) > 1:
+                name += "-{:03}".format(number + 1)
+
+            parts.append(OutputPart(len(parts), name + ".pdf", group, chunk, [values[p] for p in chunk]))
+
+    return parts
+
+def render_part(
+    part: OutputPart,
+    layout: PaperConfig,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    palette_file: str | None = None,
+    reproducible: bool = False,
+    linearized: bool = False,
+    object_streams: bool = False,
+    draw_codes: bool = False,
+    threaded: bool = False,
+    profile: str = DEFAULT_PROFILE,
+) -> RenderSummary:
+    if threaded:
+        # Runs next to other rendering threads, so nothing global gets set up.
+        # The palette goes along in the context instead.
+        from src.rendercontext import thread_context
+        ctx = thread_context()
+
+        if palette_file is not None:
+            from src.palette import load_palette
+            ctx = ctx.with_palette(load_palette(palette_file))
+    else:
+        # Runs in a worker process, so the fonts and palette have to be set up again
+        if palette_file is not None:
+            from src.palette import load_palette, use_palette
+            use_palette(load_palette(palette_file))
+
+        register_fonts()
+        ctx = DEFAULT_CONTEXT
+
+    c = create_canvas(part.filename, layout, reproducible, profile)
+    summary = render_stickers(c, layout, part.values, draw_outlines, draw_center_line,
+                              draw_codes=draw_codes, ctx=ctx)
+    c.save()
+
+    if linearized:
+        from src.linearize import linearize
+        linearize(part.filename, object_streams, reproducible)
+
+    return summary
+
+def _manifest_entry(part: OutputPart, future: Future[RenderSummary]) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "index": part.index,
+        "filename": part.filename,
+        "group": part.group,
+        "first_position": part.positions[0] if part.positions else None,
+        "last_position": part.positions[-1] if part.positions else None,
+    }
+
+    try:
+        summary = future.result()
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = repr(e)
+    else:
+        # Stickers which failed to draw show a placeholder, the rest
+        # of the part is fine. Those parts get rendered again as well.
+        entry["status"] = "partial" if summary.failures else "ok"
+        entry["pages"] = summary.pages
+        entry["stickers"] = summary.stickers
+        entry["bytes"] = os.path.getsize(part.filename)
+        entry["failures"] = [failure.to_dict() for failure in summary.failures]
+
+    return entry
+
+def _halves(part: OutputPart, layout: PaperConfig) -> List[OutputPart]:
+    # A part cut in two at a page boundary, into files named after it with
+    # "-1" and "-2" added. They keep the index, so that rendering the part
+    # again (e.g. with rerender_failed) covers both.
+    per_page = stickers_per_page(layout)
+    pages = (len(part.positions) + per_page - 1) // per_page
+    cut = pages // 2 * per_page
+    stem = os.path.splitext(part.filename)[0]
+
+    return [
+        OutputPart(part.index, "{}-{}.pdf".format(stem, number + 1), part.group,
+                   part.positions[first:last], part.values[first:last])
+        for (number, (first, last)) in enumerate([(0, cut), (cut, len(part.positions))])
+    ]
+
+def render_plan(
+    parts: List[OutputPart],
+    layout: PaperConfig,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    manifest_file: str,
+    jobs: int | None = None,
+    palette_file: str | None = None,
+    only: Sequence[int] | None = None,
+    reproducible: bool = False,
+    linearized: bool = False,
+    object_streams: bool = False,
+    draw_codes: bool = False,
+    threads: bool = False,
+    profile: str = DEFAULT_PROFILE,
+    max_bytes: int | None = None,
+) -> List[Dict[str, Any]]:
+    # Renders the parts concurrently and writes an index of all output files.
+    # With `only`, just those parts get rendered (e.g. the ones that failed
+    # last time), the manifest entries of the other parts are kept.
+    #
+    # The sizes the parts were planned with are only estimates. With
+    # `max_bytes`, a part of several pages which comes out larger than that
+    # is cut in two and rendered again, until every file fits.
+    #
+    # With `threads`, the parts are rendered by threads instead of processes,
+    # which saves sending the components to the workers. Only faster where
+    # Python runs without the GIL (free-threaded 3.13 and later).
+    entries: Dict[int, List[Dict[str, Any]]] = {}
+
+    if only is not None and os.path.exists(manifest_file):
+        with open(manifest_file, encoding="utf-8") as f:
+            for previous in json.load(f)["parts"]:
+                entries.setdefault(previous["index"], []).append(previous)
+
+    selected = [part for part in parts if only is None or part.index in only]
+    for part in selected:
+        entries[part.index] = []
+
+    pool: Executor = ThreadPoolExecutor(max_workers=jobs) if threads else ProcessPoolExecutor(max_workers=jobs)
+
+    def submit(part: OutputPart) -> Tuple[OutputPart, Future[RenderSummary]]:
+        return (part, pool.submit(render_part, part, layout, draw_outlines, draw_center_line, palette_file,
+                                  reproducible, linearized, object_streams, draw_codes, threads, profile))
+
+    with pool:
+        futures = [submit(part) for part in selected]
+
+        while futures:
+            again: List[Tuple[OutputPart, Future[RenderSummary]]] = []
+
+            for (part, future) in futures:
+                entry = _manifest_entry(part, future)
+
+                if max_bytes is not None and entry.get("bytes", 0) > max_bytes and entry["pages"] > 1:
+                    os.remove(part.filename)
+                    again.extend(submit(half) for half in _halves(part, layout))
+                else:
+                    entries[part.index].append(entry)
+
+            futures = again
+
+    written = [
+        entry for index in sorted(entries)
+        for entry in sorted(entries[index], key=lambda item: str(item["filename"]))
+    ]
+    manifest = {
+        "layout": layout.paper_name,
+        "parts": written,
+    }
+
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+        f.write("\n")
+
+    return written
+
+def failed_parts(manifest_file: str) -> List[int]:
+    # The parts which failed or have failed stickers
+    if not os.path.exists(manifest_file):
+        raise ValueError(f"There is no manifest '{manifest_file}' of an earlier run, "
+                         "so there are no failed parts to render again")
+
+    with open(manifest_file, encoding="utf-8") as f:
+        return sorted({entry["index"] for entry in json.load(f)["parts"] if entry["status"] != "ok"})
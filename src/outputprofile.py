@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Dict, TYPE_CHECKING
+
+import re
+import zlib
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+class OutputProfile:
+    # How the page contents get written: compressed or not (and how hard),
+    # ASCII85 encoded on top or not, and how many decimals the coordinates
+    # keep. The font and form XObjects are always written the reportlab way.
+    def __init__(self, name: str, compression: int | None, ascii85: bool, precision: int | None) -> None:
+        self.name = name
+        # zlib level from 1 (fastest) to 9 (smallest), None for no compression
+        self.compression = compression
+        # ASCII85 only makes the streams 25% larger, but keeps the file 7-bit clean
+        self.ascii85 = ascii85
+        # Decimals of the numbers in the page contents, None to keep all.
+        # 2 decimals are 1/7200 inch, far below what any printer resolves.
+        self.precision = precision
+
+PROFILES: Dict[str, OutputProfile] = {
+    # What reportlab does by itself, the output is left alone entirely
+    "default": OutputProfile("default", 6, True, None),
+    # Readable, uncompressed contents, for looking at or diffing the PDF
+    "none": OutputProfile("none", None, False, None),
+    "fast": OutputProfile("fast", 1, False, None),
+    "max": OutputProfile("max", 9, False, 2),
+}
+
+DEFAULT_PROFILE = "default"
+
+def get_profile(name: str) -> OutputProfile:
+    if name not in PROFILES:
+        raise KeyError(f"Unknown output profile '{name}', use one of {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+def round_numbers(stream: str, precision: int) -> str:
+    # Strings (which are left alone, they may contain anything) or numbers
+    # with more decimals than are kept, the others need no change
+    tokens = re.compile(r"\((?:\\.|[^\\)])*\)|-?\d*\.\d{%d,}" % (precision + 1))
+    pattern = "%.{}f".format(precision)
+    # The same few coordinates come up over and over on a sheet of labels
+    rounded: Dict[str, str] = {}
+
+    def replace(match: re.Match[str]) -> str:
+        token = match.group(0)
+        text = rounded.get(token)
+
+        if text is None:
+            if token[0] == "(":
+                text = token
+            else:
+                # Written the same way as reportlab does: "0.5" as ".5", no trailing zeros
+                text = (pattern % float(token)).rstrip("0").rstrip(".")
+                if text in ("", "-0", "-"):
+                    text = "0"
+                elif text.startswith(("0.", "-0.")):
+                    text = text.replace("0.", ".", 1)
+            rounded[token] = text
+
+        return text
+
+    return tokens.sub(replace, stream)
+
+def encode_page(c: Canvas, profile: OutputProfile) -> None:
+    # Encodes the contents of the page which has just been finished. This
+    # happens right away instead of when the document gets saved, so only
+    # the encoded bytes stay in memory for the rest of the job.
+    from reportlab.pdfbase.pdfdoc import PDFArray, PDFName, PDFStream, PDFStreamFilterBase85Encode
+
+    page = c._doc.Pages.pages[-1]
+    stream = page.stream
+
+    if profile.precision is not None:
+        stream = round_numbers(stream, profile.precision)
+
+    content = stream.encode("utf-8")
+    filters = []
+
+    if profile.compression is not None:
+        content = zlib.compress(content, profile.compression)
+        filters.append(PDFName("FlateDecode"))
+
+    if profile.ascii85:
+        content = PDFStreamFilterBase85Encode().encode(content)
+        filters.insert(0, PDFName("ASCII85Decode"))
+
+    contents = PDFStream(content=content)
+    if filters:
+        # Marks the content as already encoded, so reportlab leaves it as it is
+        contents.dictionary["Filter"] = PDFArray(filters)
+    contents.__Comment__ = "page stream"
+
+    page.Contents = contents
+    page.stream = None
+
+def apply_profile(c: Canvas, name: str) -> None:
+    profile = get_profile(name)
+
+    if profile.name == DEFAULT_PROFILE:
+        return
+
+    if profile.compression is None:
+        # Also leaves the font and any form XObjects uncompressed
+        c.setPageCompression(0)
+
+    c.setPageCallBack(lambda _: encode_page(c, profile))
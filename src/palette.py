@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from reportlab.lib.colors import Color, HexColor, toColor
+
+from types import MappingProxyType
+from typing import Dict, Mapping, Sequence
+
+import json
+
+class Palette:
+    # A named set of colours used when drawing the stickers. All colours get
+    # parsed once when the palette is created and are shared by every sticker.
+    def __init__(
+        self,
+        name: str,
+        bands: Sequence[Color],
+        gold: Sequence[Color],
+        silver: Sequence[Color],
+        leds: Mapping[str, Color],
+    ) -> None:
+        if len(bands) != 10:
+            raise ValueError(f"Palette '{name}' needs 10 band colours, got {len(bands)}")
+
+        if len(gold) != 4 or len(silver) != 4:
+            raise ValueError(f"Palette '{name}' needs 4 gold and 4 silver shades")
+
+        self.name = name
+        self.bands = tuple(bands)
+        self.gold = tuple(gold)
+        self.silver = tuple(silver)
+        self.leds: Mapping[str, Color] = MappingProxyType(dict(leds))
+
+    def band(self, num: int) -> Color:
+        return self.bands[num]
+
+    def led(self, name: str) -> Color:
+        if name in self.leds:
+            return self.leds[name]
+
+        # Allow plain colour specifications ("#FFC0C0") as well
+        return toColor(name)
+
+DEFAULT_PALETTE = Palette(
+    name="default",
+    bands=[
+        HexColor("#000000"), # Black
+        HexColor("#964B00"), # Brown
+        HexColor("#FF3030"), # Red
+        HexColor("#FFA500"), # Orange
+        HexColor("#FFFF00"), # Yellow
+        HexColor("#00FF00"), # Green
+        HexColor("#0000FF"), # Blue
+        HexColor("#C520F6"), # Violet
+        HexColor("#808080"), # Gray
+        HexColor("#FFFFFF"), # White
+    ],
+    gold=[
+        HexColor("#FFF0A0"),
+        HexColor("#FFE55C"),
+        HexColor("#FFD700"),
+        HexColor("#D1B000"),
+    ],
+    silver=[
+        HexColor("#D0D0D0"),
+        HexColor("#A9A9A9"),
+        HexColor("#929292"),
+        HexColor("#7B7B7B"),
+    ],
+    leds={
+        "infrared": HexColor("#800000"),
+        "red": HexColor("#FF0000"),
+        "yellow": HexColor("#FFFF00"),
+        "green": HexColor("#00FF00"),
+        "blue": HexColor("#0000FF"),
+        "white": HexColor("#FFFFFF"),
+        "unknown": HexColor("#FFC0C0"),
+    },
+)
+
+# Background colours handed to Component.draw_colorcode
+COLORCODE_LIGHT = toColor("hsl(55, 54%, 100%)")
+COLORCODE_DARK = toColor("hsl(55, 54%, 70%)")
+
+_palettes: Dict[str, Palette] = {DEFAULT_PALETTE.name: DEFAULT_PALETTE}
+_active_palette = DEFAULT_PALETTE
+
+def get_palette() -> Palette:
+    return _active_palette
+
+def use_palette(palette: Palette | str) -> None:
+    # Selects the palette for the whole job
+    global _active_palette
+
+    if isinstance(palette, str):
+        if palette not in _palettes:
+            raise KeyError(f"Unknown palette '{palette}'")
+        palette = _palettes[palette]
+
+    _active_palette = palette
+
+def register_palette(palette: Palette) -> None:
+    _palettes[palette.name] = palette
+
+def load_palette(filename: str) -> Palette:
+    # Loads a palette from a JSON file, e.g. printer-calibrated band colours:
+    #
+    # {
+    #     "name": "calibrated",
+    #     "bands": ["#000000", "#8A4500", ...],
+    #     "leds": {"red": "#E00000"}
+    # }
+    #
+    # Anything left out is taken from the default palette.
+    with open(filename, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    def colors(key: str, fallback: Sequence[Color]) -> Sequence[Color]:
+        if key not in spec:
+            return fallback
+        return [toColor(value) for value in spec[key]]
+
+    leds = dict(DEFAULT_PALETTE.leds)
+    leds.update({name: toColor(value) for name, value in spec.get("leds", {}).items()})
+
+    palette = Palette(
+        name=spec.get("name", filename),
+        bands=colors("bands", DEFAULT_PALETTE.bands),
+        gold=colors("gold", DEFAULT_PALETTE.gold),
+        silver=colors("silver", DEFAULT_PALETTE.silver),
+        leds=leds,
+    )
+
+    register_palette(palette)
+    return palette
@@ -1,6 +1,11 @@
 from reportlab.lib.pagesizes import A4, LETTER
 from reportlab.lib.units import inch, mm
-from typing import Tuple
+from typing import Dict, Tuple
+
+import copy
+
+# Supported page rotations, counterclockwise in degrees
+ROTATIONS = (0, 90, 180, 270)
 
 class PaperConfig:
     def __init__(
@@ -16,7 +21,12 @@ class PaperConfig:
         vertical_stride: float,
         num_stickers_horizontal: int,
         num_stickers_vertical: int,
+        rotation: int = 0,
+        mirror: bool = False,
     ) -> None:
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Unsupported rotation {rotation}, use one of {ROTATIONS}")
+
         self.paper_name = paper_name
         self.pagesize = pagesize
         self.sticker_width = sticker_width
@@ -28,6 +38,27 @@ class PaperConfig:
         self.vertical_stride = vertical_stride
         self.num_stickers_horizontal = num_stickers_horizontal
         self.num_stickers_vertical = num_stickers_vertical
+        # Orientation of the whole page in the output, e.g. for feeding the
+        # sheets sideways. The stickers are still laid out on the unrotated page.
+        self.rotation = rotation
+        self.mirror = mirror
+
+    def with_orientation(self, rotation: int, mirror: bool) -> "PaperConfig":
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Unsupported rotation {rotation}, use one of {ROTATIONS}")
+
+        oriented = copy.copy(self)
+        oriented.rotation = rotation
+        oriented.mirror = mirror
+        return oriented
+
+    @property
+    def output_pagesize(self) -> Tuple[float, float]:
+        # Size of the pages in the output, i.e. after the rotation
+        (width, height) = self.pagesize
+        if self.rotation in (90, 270):
+            return (height, width)
+        return (width, height)
 
 
 AVERY_5260 = PaperConfig(
@@ -90,4 +121,60 @@ VYSOCINA = PaperConfig( # Available from: https://www.obalyvysocina.cz/produkty/
 )
 
 
+class RollConfig(PaperConfig):
+    # Continuous media, e.g. for roll-fed label printers: `labels_across`
+    # labels side by side and as many rows as needed. There are no real pages,
+    # the rows are cut into chunks of `rows_per_page` rows, which become the
+    # pages of the PDF. One row per page gives one label (row) per page, which
+    # is what most roll printer drivers expect.
+    def __init__(
+        self,
+        paper_name: str,
+        roll_width: float,
+        sticker_width: float,
+        sticker_height: float,
+        sticker_corner_radius: float = 0,
+        labels_across: int = 1,
+        horizontal_gap: float = 0,
+        vertical_gap: float = 0,
+        rows_per_page: int = 1,
+    ) -> None:
+        used_width = labels_across * sticker_width + (labels_across - 1) * horizontal_gap
+        if used_width > roll_width:
+            raise ValueError(f"{labels_across} labels of this width do not fit onto the '{paper_name}' roll")
+
+        super().__init__(
+            paper_name=paper_name,
+            pagesize=(roll_width, rows_per_page * (sticker_height + vertical_gap)),
+            sticker_width=sticker_width,
+            sticker_height=sticker_height,
+            sticker_corner_radius=sticker_corner_radius,
+            left_margin=(roll_width - used_width) / 2,
+            top_margin=vertical_gap / 2,
+            horizontal_stride=sticker_width + horizontal_gap,
+            vertical_stride=sticker_height + vertical_gap,
+            num_stickers_horizontal=labels_across,
+            num_stickers_vertical=rows_per_page,
+        )
+        self.roll_width = roll_width
+        self.labels_across = labels_across
+        self.rows_per_page = rows_per_page
+
+
+ROLL_62MM = RollConfig( # 62 mm continuous tape (e.g. Brother DK-22205), cut to the size of the VYSOCINA stickers
+    paper_name="62 mm roll",
+    roll_width=62 * mm,
+    sticker_width=62 * mm,
+    sticker_height=24 * mm,
+    vertical_gap=2 * mm,
+)
+
 
+# All the presets by name, e.g. for selecting them on the command line
+LAYOUTS: Dict[str, PaperConfig] = {
+    "VYSOCINA": VYSOCINA,
+    "AVERY_5260": AVERY_5260,
+    "AVERY_L7157": AVERY_L7157,
+    "EJ_RANGE_24": EJ_RANGE_24,
+    "ROLL_62MM": ROLL_62MM,
+}
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Tuple
+
+import re
+
+PREFIXES: Dict[str, float] = {
+    "p": 1e-12,
+    "n": 1e-9,
+    "μ": 1e-6, # Greek mu
+    "µ": 1e-6, # Micro sign
+    "u": 1e-6,
+    "m": 1e-3,
+    "k": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+}
+
+BASE_UNITS = ("V", "A", "m", "F", "Ω", "W", "Hz")
+
+# "1 V", "-0.65 (-5) V", "3.4-3.8 V", "2..4 V", "620-625 nm"
+_QUANTITY_RE = re.compile(
+    r"^\s*(-?\d+(?:\.\d+)?)"           # value, or lower end of a range
+    r"(?:\s*(?:\.\.|-)\s*(-?\d+(?:\.\d+)?))?"  # upper end of a range
+    r"\s*(?:\([^)]*\))?"               # test conditions, e.g. "(-5)"
+    r"\s*(\S*)\s*$"                    # unit
+)
+
+# "M3", "M2.5x12"
+_THREAD_RE = re.compile(r"^\s*M(\d+(?:\.\d+)?)(?:\s*x\s*(\d+(?:\.\d+)?))?\s*$")
+
+class Quantity(NamedTuple):
+    # A value, or range of values, in the base unit (volts, amperes, metres...)
+    low: float
+    high: float
+    unit: str
+
+    @property
+    def value(self) -> float:
+        return (self.low + self.high) / 2
+
+    def to(self, unit: str) -> Tuple[float, float]:
+        (scale, base) = split_unit(unit)
+        if base != self.unit:
+            raise ValueError(f"Cannot convert {self.unit} to {unit}")
+        return (self.low / scale, self.high / scale)
+
+def split_unit(unit: str) -> Tuple[float, str]:
+    if unit in BASE_UNITS or unit == "":
+        return (1.0, unit)
+
+    if len(unit) > 1 and unit[0] in PREFIXES and unit[1:] in BASE_UNITS:
+        return (PREFIXES[unit[0]], unit[1:])
+
+    raise ValueError(f"Unknown unit '{unit}'")
+
+def parse_quantity(text: str | None) -> Quantity | None:
+    # Returns None for unknown values such as "??? V" or "* nm"
+    if text is None:
+        return None
+
+    match = _QUANTITY_RE.match(text)
+    if match is None:
+        return None
+
+    try:
+        (scale, unit) = split_unit(match.group(3))
+    except ValueError:
+        return None
+
+    low = float(match.group(1)) * scale
+    high = float(match.group(2)) * scale if match.group(2) is not None else low
+
+    # "-2..4 V" means -2 to -4 V
+    if low < 0 and high > 0:
+        high = -high
+
+    return Quantity(min(low, high), max(low, high), unit)
+
+def parse_thread(name: str) -> Tuple[Quantity | None, Quantity | None]:
+    # Metric thread names, returns the diameter and the length if it is given
+    match = _THREAD_RE.match(name)
+    if match is None:
+        return (None, None)
+
+    diameter = float(match.group(1)) * 1e-3
+    thread = Quantity(diameter, diameter, "m")
+
+    if match.group(2) is None:
+        return (thread, None)
+
+    length = float(match.group(2)) * 1e-3
+    return (thread, Quantity(length, length, "m"))
+
+def exact(value: float, unit: str) -> Quantity:
+    return Quantity(value, value, unit)
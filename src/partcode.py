@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from src.components.registry import COMPONENT_TYPES, get_class_name, get_type_name
+from src.stickerrect import StickerRect
+
+from functools import lru_cache
+from typing import Any, Tuple, TYPE_CHECKING
+
+import hashlib
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+    from src.components.component import Component
+
+# Width of the margin around the code, in modules. The QR standard asks for 4,
+# but the sticker edge and the whitespace next to the text make up for it.
+QUIET_ZONE = 1
+
+# Runs of dark modules: (row, first column, number of columns)
+Runs = Tuple[Tuple[int, int, int], ...]
+
+# Characters of the component texts which not every scanner setup handles
+_ASCII = str.maketrans({"μ": "u", "Ω": "Ohm", "λ": "wl"})
+
+def part_payload(component: Component) -> str:
+    # The identity of the part, e.g. "resistor:4.7 kOhm" or "FlatHeadScrew:M3x12".
+    # Types with several classes name the class instead, as a hex and a square
+    # M3 nut have the same identity. Both names are accepted by the registry.
+    name = get_type_name(component)
+    if len(COMPONENT_TYPES[name]) > 1:
+        name = get_class_name(component)
+
+    text = "{}:{}".format(name, component.get_identity())
+    return text.translate(_ASCII).encode("ascii", "replace").decode("ascii")
+
+@lru_cache(maxsize=4096)
+def qr_runs(payload: str) -> Tuple[int, Runs]:
+    # Encodes the payload and merges the dark modules of every row into runs,
+    # so that the code becomes a few dozen rectangles. Cached, as the same
+    # parts tend to get printed over and over again.
+    from reportlab.graphics.barcode import qrencoder
+
+    code = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.M)
+    code.addData(payload)
+    code.make()
+
+    count = code.getModuleCount()
+    runs = []
+
+    for row in range(count):
+        column = 0
+        while column < count:
+            if not code.isDark(row, column):
+                column += 1
+                continue
+
+            start = column
+            while column < count and code.isDark(row, column):
+                column += 1
+            runs.append((row, start, column - start))
+
+    return (count, tuple(runs))
+
+def _form_name(payload: str) -> str:
+    return "qr" + hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def _define_form(c: Canvas, name: str, count: int, runs: Runs) -> None:
+    # The code as a form XObject in module units, with the origin at the bottom
+    # left. Every other use of the same code in the document only references it.
+    c.beginForm(name, 0, 0, count, count)
+    c.setFillColorRGB(0, 0, 0)
+
+    path = c.beginPath()
+    for (row, column, length) in runs:
+        path.rect(column, count - row - 1, length, 1)
+    c.drawPath(path, stroke=0, fill=1)
+
+    c.endForm()
+
+def draw_qr_code(c: Any, x: float, y: float, size: float, payload: str) -> None:
+    # Draws the code into the square with the bottom left corner at x, y
+    (count, runs) = qr_runs(payload)
+    module = size / (count + 2 * QUIET_ZONE)
+    x += QUIET_ZONE * module
+    y += QUIET_ZONE * module
+
+    # Canvases without forms (e.g. the ZPL one) get the rectangles directly
+    raw = getattr(c, "canvas", c)
+    if not hasattr(raw, "beginForm"):
+        c.setFillColorRGB(0, 0, 0)
+        for (row, column, length) in runs:
+            c.rect(x + column * module, y + (count - row - 1) * module, length * module, module, stroke=0, fill=1)
+        return
+
+    name = _form_name(payload)
+
+    # Goes through the wrapping canvas first, so pending paths get flushed
+    c.saveState()
+    if not raw.hasForm(name):
+        _define_form(raw, name, count, runs)
+
+    c.translate(x, y)
+    c.scale(module, module)
+    raw.doForm(name)
+    c.restoreState()
+
+def draw_part_code(c: Canvas, rect: StickerRect, component: Component) -> StickerRect:
+    # Puts a QR code into a square strip on the left of each half of the
+    # sticker, and returns the remaining area for the regular contents
+    payload = part_payload(component)
+    size = rect.height / 2
+
+    for bottom in (rect.bottom, rect.bottom + size):
+        draw_qr_code(c, rect.left, bottom, size, payload)
+
+    return rect.without_left(size)
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from src.main import create_canvas, register_fonts, render_stickers
+from src.paperconfig import PaperConfig
+
+from typing import Any, Dict, List, Sequence, Set, Tuple, TYPE_CHECKING
+
+import contextlib
+import hashlib
+import io
+import os
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# A contact sheet shows the stickers of a job as small images, in the order
+# of the job, many of them per sheet. Every distinct component is drawn once
+# onto a page of its own (with the same StickerRect geometry and draw code as
+# the real output), rasterized, and kept in the cache directory under the hash
+# of everything it depends on. Looking at the job again after a few changes to
+# the catalogue only draws the components which changed. Needs pymupdf for
+# the rasterizing.
+
+# Pixels between the thumbnails on a sheet, and the grey value behind them
+_GAP = 4
+_BACKGROUND = 0xC8
+
+class PreviewSummary:
+    def __init__(self) -> None:
+        self.sheets: List[str] = []
+        self.stickers = 0
+        # Distinct components which had to be drawn, and those taken from the cache
+        self.rendered = 0
+        self.cached = 0
+        # Sheets which had to be written again
+        self.updated = 0
+
+    def __str__(self) -> str:
+        return "{} stickers on {} sheets ({} updated), {} thumbnails rendered, {} from the cache".format(
+            self.stickers, len(self.sheets), self.updated, self.rendered, self.cached)
+
+def sheet_filename(basename: str, number: int) -> str:
+    return "{}-preview-{:03}.png".format(basename, number)
+
+def _sheet_hash(digests: Sequence[str | None], columns: int) -> str:
+    # The thumbnail hashes already cover everything else the sheet depends on
+    h = hashlib.sha256(f"columns {columns} gap {_GAP} background {_BACKGROUND}\n".encode())
+    for digest in digests:
+        h.update(f"{digest}\n".encode())
+    return h.hexdigest()
+
+def thumbnail_layout(layout: PaperConfig) -> PaperConfig:
+    # A page holding exactly one sticker of the layout, unrotated
+    return PaperConfig(
+        paper_name=layout.paper_name,
+        pagesize=(layout.sticker_width, layout.sticker_height),
+        sticker_width=layout.sticker_width,
+        sticker_height=layout.sticker_height,
+        sticker_corner_radius=layout.sticker_corner_radius,
+        left_margin=0,
+        top_margin=0,
+        horizontal_stride=layout.sticker_width,
+        vertical_stride=layout.sticker_height,
+        num_stickers_horizontal=1,
+        num_stickers_vertical=1,
+    )
+
+def render_thumbnails(
+    values: Sequence[Component],
+    layout: PaperConfig,
+    draw_center_line: bool,
+    dpi: int,
+    draw_codes: bool = False,
+) -> Tuple[List[bytes], Set[int]]:
+    # PNG images of the stickers of the components, and the indices of those
+    # which failed to draw (and show the placeholder instead). All of them go
+    # through a single in-memory document.
+    import pymupdf
+
+    thumbnails = thumbnail_layout(layout)
+    buffer = io.BytesIO()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        c = create_canvas(buffer, thumbnails)  # type: ignore[arg-type]
+        summary = render_stickers(c, thumbnails, list(values), True, draw_center_line, draw_codes=draw_codes)
+        c.save()
+
+    with pymupdf.open(stream=buffer.getvalue(), filetype="pdf") as document:
+        images = [page.get_pixmap(dpi=dpi).tobytes("png") for page in document]
+
+    return (images, {failure.position for failure in summary.failures})
+
+def _plan_sheets(
+    digests: Sequence[str | None],
+    basename: str,
+    columns: int,
+    rows: int,
+) -> Tuple[List[str], List[Tuple[str, List[str | None]]]]:
+    # All the sheets of the job, and those which have to be written. The
+    # sheets whose stickers are all the same as last time are left alone,
+    # writing the PNG files takes longer than anything else.
+    from src.jobcache import read_hash_file
+
+    per_sheet = columns * rows
+    filenames: List[str] = []
+    outdated: List[Tuple[str, List[str | None]]] = []
+
+    for start in range(0, len(digests), per_sheet):
+        chunk = list(digests[start:start + per_sheet])
+        filename = sheet_filename(basename, len(filenames) + 1)
+        filenames.append(filename)
+
+        if read_hash_file(filename) != _sheet_hash(chunk, columns) or not os.path.exists(filename):
+            outdated.append((filename, chunk))
+
+    return (filenames, outdated)
+
+def _store_thumbnail(cache_dir: str, digest: str, png: bytes) -> None:
+    # Written under a temporary name first, like the job cache does
+    filename = os.path.join(cache_dir, digest + ".png")
+    with open(filename + ".tmp", "wb") as f:
+        f.write(png)
+    os.replace(filename + ".tmp", filename)
+
+def _load_thumbnails(
+    needed: Dict[str, Component],
+    cache_dir: str,
+    layout: PaperConfig,
+    draw_center_line: bool,
+    dpi: int,
+    draw_codes: bool,
+    summary: PreviewSummary,
+) -> Tuple[Dict[str, Any], Set[str]]:
+    # The thumbnails by their hash, from the cache or rendered and added to
+    # it, and the hashes of the components which failed to draw
+    import pymupdf
+
+    os.makedirs(cache_dir, exist_ok=True)
+    images: Dict[str, Any] = {}
+    missing: List[str] = []
+
+    for digest in needed:
+        filename = os.path.join(cache_dir, digest + ".png")
+        if os.path.exists(filename):
+            images[digest] = pymupdf.Pixmap(filename)
+            summary.cached += 1
+        else:
+            missing.append(digest)
+
+    if not missing:
+        return (images, set())
+
+    (pngs, failed) = render_thumbnails([needed[digest] for digest in missing], layout,
+                                       draw_center_line, dpi, draw_codes)
+    summary.rendered += len(missing)
+
+    for (number, (digest, png)) in enumerate(zip(missing, pngs)):
+        images[digest] = pymupdf.Pixmap(png)
+
+        # A failed sticker is not kept, so that it gets another try next time
+        if number not in failed:
+            _store_thumbnail(cache_dir, digest, png)
+
+    return (images, {missing[number] for number in failed})
+
+def _thumbnail_size(layout: PaperConfig, dpi: int) -> Tuple[int, int]:
+    # The size of every thumbnail in pixels, rounded the way pymupdf does it
+    import pymupdf
+
+    zoom = dpi / 72
+    box = (pymupdf.Rect(0, 0, *thumbnail_layout(layout).pagesize) * pymupdf.Matrix(zoom, zoom)).irect
+    return (box.width, box.height)
+
+def _write_sheet(
+    filename: str,
+    chunk: Sequence[str | None],
+    images: Dict[str, Any],
+    columns: int,
+    size: Tuple[int, int],
+) -> None:
+    import pymupdf
+
+    (width, height) = size
+    used_rows = (len(chunk) + columns - 1) // columns
+
+    sheet = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(
+        0, 0, columns * (width + _GAP) + _GAP, used_rows * (height + _GAP) + _GAP), False)
+    sheet.clear_with(_BACKGROUND)
+
+    for (index, digest) in enumerate(chunk):
+        if digest is None:
+            continue
+
+        image = images[digest]
+        (row, column) = divmod(index, columns)
+        image.set_origin(_GAP + column * (width + _GAP), _GAP + row * (height + _GAP))
+        sheet.copy(image, image.irect)
+
+    sheet.save(filename)
+
+def _remove_sheets(basename: str, first: int) -> None:
+    # The sheets from number `first` on, left over from a longer job before
+    number = first
+    while True:
+        filename = sheet_filename(basename, number)
+        removed = False
+
+        for leftover in (filename, filename + ".sha256"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+                removed = True
+
+        if not removed:
+            return
+        number += 1
+
+def render_preview(
+    values: Sequence[Component | None],
+    layout: PaperConfig,
+    basename: str,
+    draw_center_line: bool,
+    cache_dir: str,
+    dpi: int = 60,
+    columns: int = 12,
+    rows: int = 25,
+    draw_codes: bool = False,
+) -> PreviewSummary:
+    # Writes the contact sheets of the job, `columns` x `rows` stickers each.
+    # Empty positions stay empty, so every sticker keeps its place in the order.
+    from src.jobcache import job_hash, value_hash, write_hash_file
+
+    register_fonts()
+    summary = PreviewSummary()
+
+    # Everything but the component itself, the same for every thumbnail
+    base = job_hash(thumbnail_layout(layout), [], dpi=dpi, draw_center_line=draw_center_line,
+                    draw_codes=draw_codes)
+
+    digests = [value_hash(base, value) if value is not None else None for value in values]
+    summary.stickers = sum(1 for digest in digests if digest is not None)
+
+    (summary.sheets, outdated) = _plan_sheets(digests, basename, columns, rows)
+    _remove_sheets(basename, len(summary.sheets) + 1)
+
+    # Only the thumbnails of the sheets which get written are needed
+    needed_digests = {digest for (_, chunk) in outdated for digest in chunk}
+    needed: Dict[str, Component] = {
+        digest: value for (digest, value) in zip(digests, values)
+        if digest is not None and digest in needed_digests and value is not None
+    }
+    (images, failed) = _load_thumbnails(needed, cache_dir, layout, draw_center_line, dpi, draw_codes, summary)
+
+    size = _thumbnail_size(layout, dpi)
+    for (filename, chunk) in outdated:
+        _write_sheet(filename, chunk, images, columns, size)
+        summary.updated += 1
+
+        # A sheet with a failed sticker gets written again next time
+        if failed.isdisjoint(chunk):
+            write_hash_file(filename, _sheet_hash(chunk, columns))
+
+    return summary
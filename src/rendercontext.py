@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import List, TYPE_CHECKING
+
+import threading
+import weakref
+
+if TYPE_CHECKING:
+    from src.palette import Palette
+
+FONT_FILE = "Roboto-Bold.ttf"
+
+class RenderContext:
+    # What the drawing code needs besides the canvas. Threads which render at
+    # the same time each get a context of their own (see thread_context), so
+    # that they share nothing that changes while drawing.
+    def __init__(self, font: str, palette: Palette | None = None) -> None:
+        # The name the font is registered under with reportlab
+        self.font = font
+        # The colours to draw with, None for the palette chosen for the whole
+        # job with palette.use_palette()
+        self.palette = palette
+
+    def get_palette(self) -> Palette:
+        if self.palette is not None:
+            return self.palette
+
+        from src.palette import get_palette
+        return get_palette()
+
+    def with_palette(self, palette: Palette) -> RenderContext:
+        return RenderContext(self.font, palette)
+
+# The font registered by main.register_fonts(), used unless told otherwise
+DEFAULT_CONTEXT = RenderContext("main")
+
+def register_font(name: str) -> RenderContext:
+    # reportlab's font machinery is only imported once rendering actually starts
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    pdfmetrics.registerFont(TTFont(name, FONT_FILE))
+    return RenderContext(name)
+
+_local = threading.local()
+
+# The fonts of the rendering threads. A font goes back to the pool when its
+# thread ends and is handed to the next new thread, so there are never more
+# of them than threads which ran at the same time.
+_pool_lock = threading.Lock()
+_free_fonts: List[str] = []
+_font_count = 0
+
+def _acquire_font() -> str:
+    global _font_count
+
+    with _pool_lock:
+        if _free_fonts:
+            return _free_fonts.pop()
+
+        _font_count += 1
+        name = "main-{}".format(_font_count)
+        register_font(name)
+        return name
+
+def _release_font(name: str) -> None:
+    with _pool_lock:
+        _free_fonts.append(name)
+
+def thread_context() -> RenderContext:
+    # A context for the calling thread, with a font of its own: a TTFont
+    # collects the subset of glyphs used by every document it is drawn into,
+    # which is not something to share between threads
+    context = getattr(_local, "context", None)
+
+    if context is None:
+        context = RenderContext(_acquire_font())
+        # The thread-local data goes away with the thread, and the font with it
+        weakref.finalize(context, _release_font, context.font)
+        _local.context = context
+
+    return context
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from src.main import RenderSummary, create_canvas, register_fonts, render_stickers
+from src.outputprofile import DEFAULT_PROFILE
+from src.paperconfig import RollConfig
+
+from itertools import count, islice
+from typing import Iterable, Iterator, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+def roll_filename(basename: str, number: int) -> str:
+    return "{}-{:04}.pdf".format(basename, number)
+
+def render_roll(
+    values: Iterable[Component | None],
+    layout: RollConfig,
+    basename: str,
+    draw_outlines: bool,
+    draw_center_line: bool,
+    pages_per_file: int = 500,
+    reproducible: bool = False,
+    draw_codes: bool = False,
+    profile: str = DEFAULT_PROFILE,
+) -> Iterator[Tuple[str, RenderSummary]]:
+    # Renders an unbounded stream of components (e.g. a generator) onto roll
+    # media. reportlab keeps a whole document in memory until it is saved, so
+    # the roll is written as a series of files of `pages_per_file` pages each.
+    # Only one of those is held at a time, no matter how long the job is, and
+    # every finished file is yielded right away so it can be sent off.
+    register_fonts()
+
+    per_file = pages_per_file * layout.labels_across * layout.rows_per_page
+    remaining = iter(values)
+
+    for number in count(1):
+        chunk = list(islice(remaining, per_file))
+        if not chunk:
+            return
+
+        filename = roll_filename(basename, number)
+        c = create_canvas(filename, layout, reproducible, profile)
+        summary = render_stickers(c, layout, chunk, draw_outlines, draw_center_line, draw_codes=draw_codes)
+        c.save()
+
+        yield (filename, summary)
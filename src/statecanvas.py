@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+def _rgb(color: Any) -> Tuple[float, ...] | None:
+    # Only plain RGB colours are compared, anything else is always emitted.
+    # The colours are duck-typed so that this module does not pull in
+    # reportlab.lib.colors on import.
+    if hasattr(color, "cyan"):
+        return None
+
+    if hasattr(color, "red"):
+        return (color.red, color.green, color.blue)
+
+    if isinstance(color, (tuple, list)) and len(color) == 3:
+        return tuple(color)
+
+    return None
+
+class CanvasMark:
+    # How far the drawing on the current page had got, so that everything
+    # drawn after it can be taken back, e.g. a sticker which failed half way.
+    # Either rollback() or release() has to be called, exactly once.
+
+    def __init__(self, c: Canvas) -> None:
+        self._c = c
+        self._code_length = len(c._code)
+        self._depth = len(c.state_stack)
+        # Only a copy of the state on the Python side, nothing goes into the PDF
+        c.push_state_stack()
+
+    def release(self) -> None:
+        # Keeps what has been drawn, and drops the saved state
+        del self._c.state_stack[self._depth]
+
+    def rollback(self) -> None:
+        del self._c._code[self._code_length:]
+        del self._c.state_stack[self._depth + 1:]
+        self._c.pop_state_stack()
+
+class StateTrackingCanvas:
+    # Wraps a Canvas and drops graphics state changes which would not change
+    # anything, so that only the differences end up in the PDF.
+    #
+    # The current state is taken from the wrapped canvas itself, which already
+    # keeps track of it across saveState/restoreState and resets it on every
+    # new page. Stroke and fill alpha are passed on as they are, as reportlab
+    # already skips those when they do not change.
+
+    def __init__(self, c: Canvas) -> None:
+        self._c = c
+        self.elided_state_changes = 0
+
+    @property
+    def canvas(self) -> Canvas:
+        return self._c
+
+    def mark(self) -> CanvasMark:
+        # The state is read from the wrapped canvas, so restoring it there is
+        # all it takes
+        return CanvasMark(self._c)
+
+    def _before_state_change(self) -> None:
+        # Called right before an operator which changes the state is emitted
+        pass
+
+    def _elide(self) -> None:
+        self.elided_state_changes += 1
+
+    def _set_color(self, current: Any, aColor: Any, alpha: float | None, set_color: str, set_alpha: str) -> None:
+        rgb = _rgb(aColor)
+
+        if rgb is None or rgb != _rgb(current):
+            self._before_state_change()
+            getattr(self._c, set_color)(aColor, alpha)
+            return
+
+        self._elide()
+
+        if alpha is None:
+            alpha = getattr(aColor, "alpha", None)
+
+        if alpha is not None:
+            self._before_state_change()
+            getattr(self._c, set_alpha)(alpha)
+
+    def setStrokeColor(self, aColor: Any, alpha: float | None = None) -> None:
+        self._set_color(self._c._strokeColorObj, aColor, alpha, "setStrokeColor", "setStrokeAlpha")
+
+    def setFillColor(self, aColor: Any, alpha: float | None = None) -> None:
+        self._set_color(self._c._fillColorObj, aColor, alpha, "setFillColor", "setFillAlpha")
+
+    def setStrokeColorRGB(self, r: float, g: float, b: float, alpha: float | None = None) -> None:
+        self.setStrokeColor((r, g, b), alpha)
+
+    def setFillColorRGB(self, r: float, g: float, b: float, alpha: float | None = None) -> None:
+        self.setFillColor((r, g, b), alpha)
+
+    def setLineWidth(self, width: float) -> None:
+        if self._c._lineWidth == width:
+            self._elide()
+            return
+
+        self._before_state_change()
+        self._c.setLineWidth(width)
+
+    def setLineCap(self, mode: int) -> None:
+        if self._c._lineCap == mode:
+            self._elide()
+            return
+
+        self._before_state_change()
+        self._c.setLineCap(mode)
+
+    def setFont(self, psfontname: str, size: float, leading: float | None = None) -> None:
+        if leading is None:
+            leading = size * 1.2
+
+        if (self._c._fontname, self._c._fontsize, self._c._leading) == (psfontname, size, leading):
+            self._elide()
+            return
+
+        self._before_state_change()
+        self._c.setFont(psfontname, size, leading)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._c, name)
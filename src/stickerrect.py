@@ -1,25 +1,78 @@
-from reportlab.pdfgen.canvas import Canvas
+from __future__ import annotations
 
 from src.paperconfig import PaperConfig
 
+from functools import lru_cache
+from typing import Tuple, TYPE_CHECKING
+
+import copy
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+# (a, b, c, d, e, f) of a PDF transformation matrix
+Matrix = Tuple[float, float, float, float, float, float]
+
+@lru_cache(maxsize=None)
+def sticker_slots(layout: PaperConfig) -> Tuple[Tuple[Tuple[float, float], ...], ...]:
+    # The bottom left corners of all the stickers on a page, by row and column.
+    # Layouts never change, so this is only computed once for every layout.
+    return tuple(
+        tuple(
+            (layout.left_margin + layout.horizontal_stride * column,
+             layout.pagesize[1] - (layout.sticker_height + layout.top_margin + layout.vertical_stride * row))
+            for column in range(layout.num_stickers_horizontal)
+        )
+        for row in range(layout.num_stickers_vertical)
+    )
+
+@lru_cache(maxsize=None)
+def page_transform(layout: PaperConfig) -> Matrix | None:
+    # Maps the unrotated page onto the output page, as a single matrix which
+    # gets applied once at the beginning of every page. None if there is
+    # nothing to do.
+    (width, height) = layout.pagesize
+
+    (a, b, c, d, e, f) = {
+        0: (1, 0, 0, 1, 0, 0),
+        90: (0, 1, -1, 0, height, 0),
+        180: (-1, 0, 0, -1, width, height),
+        270: (0, -1, 1, 0, 0, width),
+    }[layout.rotation]
+
+    if layout.mirror:
+        # Flip horizontally, after the rotation
+        (a, c, e) = (-a, -c, layout.output_pagesize[0] - e)
+    elif layout.rotation == 0:
+        return None
+
+    return (a, b, c, d, e, f)
+
 class StickerRect:
     def __init__(self, c: Canvas, layout: PaperConfig, row: int, column: int, mirror: bool):
-        self.left = layout.left_margin + layout.horizontal_stride * column
-        self.bottom = layout.pagesize[1] - (
-            layout.sticker_height + layout.top_margin + layout.vertical_stride * row
-        )
+        (self.left, self.bottom) = sticker_slots(layout)[row][column]
         self.width = layout.sticker_width
         self.height = layout.sticker_height
         self.corner = layout.sticker_corner_radius
 
+        # Turns this one sticker upside down. For whole pages, use the
+        # orientation of the layout instead, which costs no state changes.
         self._mirror = mirror
+        self._pagesize = layout.pagesize
         self._c = c
 
+    def without_left(self, width: float) -> "StickerRect":
+        # The rest of the sticker after taking a strip off its left side
+        rest = copy.copy(self)
+        rest.left += width
+        rest.width -= width
+        return rest
+
     def __enter__(self) -> "StickerRect":
 
         if self._mirror:
-            pagewidth = self._c._pagesize[0]
-            pageheight = self._c._pagesize[1]
+            pagewidth = self._pagesize[0]
+            pageheight = self._pagesize[1]
             self._c.saveState()
             self._c.translate(pagewidth, pageheight)
             self._c.rotate(180)
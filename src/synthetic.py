@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from src.components.registry import create_component
+from src.eseries import series_values
+
+from functools import lru_cache
+from itertools import accumulate
+from random import Random
+from typing import Callable, Dict, Iterator, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Reproducible, made up jobs of any size for benchmarking. The same seed and
+# mix always give the same components, in the same order.
+#
+#   for component in synthetic_catalogue(100000, seed=1): ...
+
+# How often every kind of part shows up, relative to the others
+DEFAULT_MIX: Dict[str, float] = {
+    "resistor": 40,
+    "capacitor": 20,
+    "BJT": 6,
+    "FET": 4,
+    "LED": 4,
+    "zener": 3,
+    "nut": 8,
+    "screw": 10,
+    "spring": 5,
+}
+
+# Fraction of the positions left empty (None), as in hand-made jobs
+DEFAULT_GAP_RATE = 0.01
+
+_THREADS: Tuple[Tuple[str, float], ...] = (
+    # Thread and nominal diameter in mm
+    ("M2", 2), ("M2.5", 2.5), ("M3", 3), ("M4", 4), ("M5", 5), ("M6", 6), ("M8", 8),
+)
+
+_SCREW_LENGTHS = (4, 5, 6, 8, 10, 12, 16, 20, 25, 30, 40)
+
+_LEDS: Tuple[Tuple[str, str, str], ...] = (
+    # Palette colour, forward voltage and wavelength
+    ("red", "1.9-2.1 V", "620-625 nm"),
+    ("yellow", "1.9-2.1 V", "588-590 nm"),
+    ("green", "2.1-3.0 V", "567-570 nm"),
+    ("blue", "3.0-3.2 V", "455-465 nm"),
+    ("white", "3.0-3.2 V", "* nm"),
+    ("infrared", "1.2 V", "940 nm"),
+)
+
+@lru_cache(maxsize=None)
+def _values(series: str, start: float, stop: float) -> Tuple[float, ...]:
+    return tuple(series_values(series, start, stop))
+
+def _mm(value: float) -> str:
+    return "{:g} mm".format(value)
+
+def _resistor(rng: Random) -> Component:
+    series = rng.choices(("E12", "E24", "E96"), (3, 5, 2))[0]
+    value = rng.choice(_values(series, 1, 1e7))
+    return create_component("Resistor", value, series == "E96")
+
+def _capacitor(rng: Random) -> Component:
+    series = rng.choice(("E6", "E12"))
+    return create_component("Capacitor", rng.choice(_values(series, 1e-12, 1e-3)))
+
+def _bjt(rng: Random) -> Component:
+    pins = rng.choice((("1", "2", "3"), ("3", "2", "1"), ("2", "3", "1")))
+    current = rng.choice((100, 150, 200, 500, 600, 800))
+    voltage = rng.choice((20, 25, 30, 40, 45, 50, 60, 80, 100, 160))
+
+    if rng.random() < 0.5:
+        return create_component("NPNBJT", "SN{}".format(rng.randrange(1000, 10000)), *pins,
+                                "{:.2g} (5) V".format(rng.uniform(0.6, 1.2)),
+                                "{} mA".format(current), "{} V".format(voltage))
+
+    return create_component("PNPBJT", "SP{}".format(rng.randrange(1000, 10000)), *pins,
+                            "-{:.2g} (-5) V".format(rng.uniform(0.6, 1.2)),
+                            "-{} mA".format(current), "-{} V".format(voltage))
+
+def _fet(rng: Random) -> Component:
+    threshold = rng.choice(("1..2", "2..4", "1..2.5"))
+    current = rng.choice((1.5, 4.8, 6.5, 10, 20, 33))
+    voltage = rng.choice((20, 30, 55, 60, 100, 200))
+
+    if rng.random() < 0.5:
+        return create_component("NMOSFET", "SNF{}".format(rng.randrange(100, 1000)), "1", "2", "3",
+                                "{} V".format(threshold), "{} A".format(current), "{} V".format(voltage))
+
+    return create_component("PMOSFET", "SPF{}".format(rng.randrange(100, 1000)), "1", "2", "3",
+                            "-{} V".format(threshold), "-{} A".format(current), "-{} V".format(voltage))
+
+def _led(rng: Random) -> Component:
+    (color, vf, wl) = rng.choice(_LEDS)
+    return create_component("LED", rng.choice(("3 mm", "5 mm")), vf, "20 mA", wl, color)
+
+def _zener(rng: Random) -> Component:
+    voltage = rng.choice(_values("E24", 2.4, 48))
+    return create_component("ZenerDiode", "SZ{:g}".format(voltage).replace(".", "V"),
+                            "{:g} V".format(voltage), "5 mA", "1 V")
+
+def _nut(rng: Random) -> Component:
+    (thread, d) = rng.choice(_THREADS)
+
+    if rng.random() < 0.2:
+        return create_component("Washer", thread, _mm(round(d * 0.2, 1)), _mm(round(d * 2.1)))
+
+    name = "HexNut" if rng.random() < 0.8 else "SquareNut"
+    return create_component(name, thread, _mm(round(d * 0.8, 1)), _mm(round(d * 1.7, 1)),
+                            _mm(round(d * 1.9, 1)))
+
+def _screw(rng: Random) -> Component:
+    (thread, d) = rng.choice(_THREADS)
+    name = rng.choices(("RoundHeadScrew", "FlatHeadScrew", "RecessedHeadScrew"), (5, 3, 2))[0]
+    length = rng.choice(_SCREW_LENGTHS)
+    head = (_mm(round(d * 1.9, 1)), _mm(round(d * 0.7, 1)))
+
+    if rng.random() < 0.5:
+        return create_component(name, "{}x{}".format(thread, length), *head)
+    return create_component(name, thread, *head, _mm(length))
+
+def _spring(rng: Random) -> Component:
+    name = "ExtensionSpring" if rng.random() < 0.6 else "CompressionSpring"
+    return create_component(name, _mm(rng.choice((4, 4.5, 5, 5.5, 6.5, 7, 8, 8.5, 9.5))),
+                            _mm(round(rng.uniform(10, 80) * 2) / 2))
+
+_GENERATORS: Dict[str, Callable[[Random], Component]] = {
+    "resistor": _resistor,
+    "capacitor": _capacitor,
+    "BJT": _bjt,
+    "FET": _fet,
+    "LED": _led,
+    "zener": _zener,
+    "nut": _nut,
+    "screw": _screw,
+    "spring": _spring,
+}
+
+def synthetic_catalogue(
+    count: int,
+    seed: int = 0,
+    mix: Dict[str, float] | None = None,
+    gap_rate: float = DEFAULT_GAP_RATE,
+) -> Iterator[Component | None]:
+    # Generated one by one, so that even a million labels can be streamed into
+    # a renderer without holding them all in memory
+    if mix is None:
+        mix = DEFAULT_MIX
+
+    for kind in mix:
+        if kind not in _GENERATORS:
+            raise KeyError(f"Unknown kind of part '{kind}', use one of {', '.join(_GENERATORS)}")
+
+    rng = Random(seed)
+    generators: List[Callable[[Random], Component]] = [_GENERATORS[kind] for kind in mix]
+    cumulative = list(accumulate(mix.values()))
+
+    for _ in range(count):
+        if rng.random() < gap_rate:
+            yield None
+        else:
+            yield rng.choices(generators, cum_weights=cumulative)[0](rng)
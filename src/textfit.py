@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from functools import lru_cache
+from typing import Iterable
+
+@lru_cache(maxsize=65536)
+def unit_width(text: str, font: str) -> float:
+    # String widths scale linearly with the font size, so measuring every
+    # string once at size 1 is enough to fit it at any size.
+    return float(stringWidth(text, font, 1))
+
+def text_width(text: str, font: str, size: float) -> float:
+    return unit_width(text, font) * size
+
+def fit_font_size(text: str, font: str, max_size: float, max_width: float) -> float:
+    # The largest font size up to max_size at which the text fits into max_width
+    width = unit_width(text, font)
+
+    if width * max_size <= max_width:
+        return max_size
+
+    return max_width / width
+
+def fit_common_font_size(texts: Iterable[str | None], font: str, max_size: float, max_width: float) -> float:
+    # Same as fit_font_size, but one size for a group of lines, so that they
+    # do not end up in different sizes
+    size = max_size
+
+    for text in texts:
+        if text:
+            size = min(size, fit_font_size(text, font, max_size, max_width))
+
+    return size
+
+def clear_cache() -> None:
+    # Needed if a different font gets registered under an already used name
+    unit_width.cache_clear()
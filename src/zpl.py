@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+from src.paperconfig import PaperConfig
+from src.stickerrect import StickerRect
+from src.textfit import text_width
+
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence, Tuple, TYPE_CHECKING
+
+import math
+import select
+import socket
+import socketserver
+import threading
+
+if TYPE_CHECKING:
+    from src.components.component import Component
+
+# Printer resolutions in dots per inch (8, 12 and 24 dots/mm)
+DPI_203 = 203
+DPI_300 = 300
+DPI_600 = 600
+
+# Thermal printers only know black and white. Fills darker than this get
+# printed black, lighter ones only get their outline.
+_DARKNESS_THRESHOLD = 0.5
+
+# Top of a text field relative to its baseline, as a fraction of the font height
+_ASCENT = 0.8
+
+# Number of straight segments arcs get approximated with
+_ARC_SEGMENTS = 12
+
+def _luminance(color: Any) -> float:
+    # Duck-typed like in statecanvas, CMYK colours are treated as dark
+    if hasattr(color, "red"):
+        return float(0.299 * color.red + 0.587 * color.green + 0.114 * color.blue)
+    if isinstance(color, tuple):
+        return float(0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2])
+    return 0.0
+
+def _escape(text: str) -> str:
+    # ^ and ~ are command prefixes in ZPL, ^FH lets them be written as hex
+    return text.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+class _Path:
+    # Just enough of reportlab's PDFPathObject for the component icons
+    def __init__(self) -> None:
+        self.segments: List[Tuple[float, float, float, float]] = []
+        self._start = (0.0, 0.0)
+        self._current = (0.0, 0.0)
+
+    def moveTo(self, x: float, y: float) -> None:
+        self._start = self._current = (x, y)
+
+    def lineTo(self, x: float, y: float) -> None:
+        self.segments.append((*self._current, x, y))
+        self._current = (x, y)
+
+    def close(self) -> None:
+        if self._current != self._start:
+            self.lineTo(*self._start)
+
+class ZPLCanvas:
+    # Records the drawing operations of a single label as ZPL II commands. It
+    # implements the part of reportlab's Canvas interface which the components
+    # use, so their regular draw methods produce the thermal labels as well.
+    #
+    # Coordinates come in as points with the origin at the bottom left, like in
+    # the PDF, and get converted to printer dots with the origin at the top left.
+
+    def __init__(self, width: float, height: float, dpi: int = DPI_203) -> None:
+        self._pagesize = (width, height)
+        self._scale = dpi / 72
+        self._commands: List[str] = []
+
+        self._line_width = 1.0
+        self._stroke_alpha = 1.0
+        self._fill_color: Any = None
+        self._fill_alpha = 1.0
+        self._font = ("main", 10.0)
+        self._states: List[Tuple[Any, ...]] = []
+
+    def _dots(self, value: float) -> int:
+        return round(value * self._scale)
+
+    def _point(self, x: float, y: float) -> Tuple[int, int]:
+        return (self._dots(x), self._dots(self._pagesize[1] - y))
+
+    def _thickness(self) -> int:
+        return max(1, self._dots(self._line_width))
+
+    def _strokes(self) -> bool:
+        return self._stroke_alpha > 0
+
+    def _fills_dark(self) -> bool:
+        return self._fill_alpha >= _DARKNESS_THRESHOLD and _luminance(self._fill_color) < _DARKNESS_THRESHOLD
+
+    def getZPL(self) -> str:
+        (width, height) = self._pagesize
+        header = "^XA^CI28^PW{}^LL{}^LH0,0".format(self._dots(width), self._dots(height))
+        return header + "".join(self._commands) + "^XZ\n"
+
+    # State
+
+    def saveState(self) -> None:
+        self._states.append((self._line_width, self._stroke_alpha, self._fill_color, self._fill_alpha, self._font))
+
+    def restoreState(self) -> None:
+        (self._line_width, self._stroke_alpha, self._fill_color, self._fill_alpha, self._font) = self._states.pop()
+
+    def setLineWidth(self, width: float) -> None:
+        self._line_width = width
+
+    def setLineCap(self, mode: int) -> None:
+        pass
+
+    def setStrokeColor(self, aColor: Any, alpha: float | None = None) -> None:
+        self._stroke_alpha = alpha if alpha is not None else getattr(aColor, "alpha", 1.0)
+
+    def setStrokeColorRGB(self, r: float, g: float, b: float, alpha: float | None = None) -> None:
+        self._stroke_alpha = alpha if alpha is not None else 1.0
+
+    def setFillColorRGB(self, r: float, g: float, b: float, alpha: float | None = None) -> None:
+        self._fill_color = (r, g, b)
+        self._fill_alpha = alpha if alpha is not None else 1.0
+
+    def setFillColor(self, aColor: Any, alpha: float | None = None) -> None:
+        self._fill_color = aColor
+        self._fill_alpha = alpha if alpha is not None else getattr(aColor, "alpha", 1.0)
+
+    def setFont(self, psfontname: str, size: float, leading: float | None = None) -> None:
+        self._font = (psfontname, size)
+
+    def setTitle(self, title: str) -> None:
+        pass
+
+    # Shapes
+
+    def _box(self, x: int, y: int, width: int, height: int, thickness: int) -> None:
+        # ^GB draws its border inwards, so the box must be at least that large
+        width = max(width, thickness)
+        height = max(height, thickness)
+        self._commands.append("^FO{},{}^GB{},{},{}^FS".format(x, y, width, height, thickness))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        if not self._strokes():
+            return
+
+        (ax, ay) = self._point(x1, y1)
+        (bx, by) = self._point(x2, y2)
+        t = self._thickness()
+
+        if ay == by or ax == bx:
+            self._box(min(ax, bx) - (t // 2 if ax == bx else 0), min(ay, by) - (t // 2 if ay == by else 0),
+                      abs(bx - ax), abs(by - ay), t)
+            return
+
+        # Diagonals: R leans like '/', L like '\'
+        orientation = "R" if (bx - ax) * (by - ay) < 0 else "L"
+        self._commands.append("^FO{},{}^GD{},{},{},B,{}^FS".format(
+            min(ax, bx), min(ay, by), abs(bx - ax), abs(by - ay), t, orientation))
+
+    def lines(self, linelist: Iterable[Sequence[float]]) -> None:
+        for (x1, y1, x2, y2) in linelist:
+            self.line(x1, y1, x2, y2)
+
+    def rect(self, x: float, y: float, width: float, height: float, stroke: int = 1, fill: int = 0) -> None:
+        (left, top) = self._point(x, y + height)
+        (w, h) = (self._dots(width), self._dots(height))
+
+        if fill and self._fills_dark():
+            self._box(left, top, w, h, min(w, h))
+        elif stroke and self._strokes() or fill:
+            # Light fills have no equivalent, they at least keep their outline
+            self._box(left, top, w, h, self._thickness())
+
+    def circle(self, x_cen: float, y_cen: float, r: float, stroke: int = 1, fill: int = 0) -> None:
+        (x, y) = self._point(x_cen - r, y_cen + r)
+        diameter = self._dots(2 * r)
+        thickness = diameter // 2 if fill and self._fills_dark() else self._thickness()
+        self._commands.append("^FO{},{}^GC{},{},B^FS".format(x, y, diameter, thickness))
+
+    def arc(self, x1: float, y1: float, x2: float, y2: float, startAng: float = 0, extent: float = 90) -> None:
+        (cx, cy) = ((x1 + x2) / 2, (y1 + y2) / 2)
+        (rx, ry) = (abs(x2 - x1) / 2, abs(y2 - y1) / 2)
+
+        points = [
+            (cx + rx * math.cos(math.radians(startAng + extent * i / _ARC_SEGMENTS)),
+             cy + ry * math.sin(math.radians(startAng + extent * i / _ARC_SEGMENTS)))
+            for i in range(_ARC_SEGMENTS + 1)
+        ]
+
+        for ((ax, ay), (bx, by)) in zip(points, points[1:]):
+            self.line(ax, ay, bx, by)
+
+    def beginPath(self) -> _Path:
+        return _Path()
+
+    def drawPath(self, aPath: _Path, stroke: int = 1, fill: int = 0, **kwargs: Any) -> None:
+        # Arbitrary shapes cannot be filled, filled paths get their outline
+        if stroke or fill:
+            for segment in aPath.segments:
+                self.line(*segment)
+
+    # Text
+
+    def _text(self, x: float, y: float, text: str, align: str) -> None:
+        if not text:
+            return
+
+        (font, size) = self._font
+        height = self._dots(size)
+
+        # Field blocks align the text on the printer, which uses its own font.
+        # The width of the block is measured with our font plus some slack.
+        width = self._dots(text_width(text, font, size) * 1.2) + height
+        (px, baseline) = self._point(x, y)
+
+        left = {"L": px, "C": px - width // 2, "R": px - width}[align]
+        self._commands.append("^FO{},{}^A0N,{},{}^FB{},1,0,{}^FH^FD{}^FS".format(
+            max(0, left), max(0, baseline - round(height * _ASCENT)), height, height,
+            width, align, _escape(text)))
+
+    def drawString(self, x: float, y: float, text: str, *args: Any, **kwargs: Any) -> None:
+        self._text(x, y, text, "L")
+
+    def drawCentredString(self, x: float, y: float, text: str, *args: Any, **kwargs: Any) -> None:
+        self._text(x, y, text, "C")
+
+    def drawRightString(self, x: float, y: float, text: str, *args: Any, **kwargs: Any) -> None:
+        self._text(x, y, text, "R")
+
+def label_layout(layout: PaperConfig) -> PaperConfig:
+    # A "page" holding exactly one sticker of the given layout
+    (width, height) = (layout.sticker_width, layout.sticker_height)
+    return PaperConfig(layout.paper_name, (width, height), width, height,
+                       layout.sticker_corner_radius, 0, 0, width, height, 1, 1)
+
+def render_label(
+    component: Component,
+    layout: PaperConfig,
+    draw_center_line: bool,
+    dpi: int = DPI_203,
+    draw_codes: bool = False,
+) -> str:
+    single = label_layout(layout)
+    zpl = ZPLCanvas(single.sticker_width, single.sticker_height, dpi)
+    # Stands in for a reportlab canvas, as far as the drawing code is concerned
+    c: Any = zpl
+
+    with StickerRect(c, single, 0, 0, False) as rect:
+        if draw_codes:
+            from src.partcode import draw_part_code
+            rect = draw_part_code(c, rect, component)
+        component.draw(c, rect, draw_center_line)
+
+    return zpl.getZPL()
+
+def zpl_labels(
+    values: Iterable[Component | None],
+    layout: PaperConfig,
+    draw_center_line: bool,
+    dpi: int = DPI_203,
+    draw_codes: bool = False,
+) -> Iterator[str]:
+    # One ^XA...^XZ format per label, generated while iterating, so that the
+    # printer can start on the first label before the last one is converted.
+    # Padding (None) only matters on sheets and is skipped on rolls.
+    from src.main import register_fonts
+
+    register_fonts()
+
+    for value in values:
+        if value is not None:
+            yield render_label(value, layout, draw_center_line, dpi, draw_codes)
+
+def write_zpl(labels: Iterable[str], stream: BinaryIO) -> int:
+    count = 0
+    for label in labels:
+        stream.write(label.encode("utf-8"))
+        count += 1
+    return count
+
+def send_zpl(labels: Iterable[str], host: str, port: int = 9100, timeout: float = 30) -> int:
+    # Raw printing, as supported by practically all network label printers
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        with sock.makefile("wb") as stream:
+            return write_zpl(labels, stream)
+
+class _CaptureTCPServer(socketserver.ThreadingTCPServer):
+    # Wait for the handlers on close, so that no data is lost
+    block_on_close = True
+
+    def __init__(self, address: Tuple[str, int]) -> None:
+        super().__init__(address, _CaptureHandler)
+        # The handlers run on threads of their own and share the output file
+        self.lock = threading.Lock()
+        self.output: BinaryIO | None = None
+
+class _CaptureHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server = self.server
+        assert isinstance(server, _CaptureTCPServer)
+
+        for chunk in iter(lambda: self.rfile.read(65536), b""):
+            with server.lock:
+                assert server.output is not None
+                server.output.write(chunk)
+                server.output.flush()
+
+class CaptureServer:
+    # A stand-in for a network printer, for testing without one: accepts raw
+    # print jobs on a local port and appends them to a file.
+    #
+    #   with CaptureServer("labels.zpl") as server:
+    #       send_zpl(labels, "127.0.0.1", server.port)
+    def __init__(self, filename: str, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = _CaptureTCPServer((host, port))
+        self._filename = filename
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    def __enter__(self) -> "CaptureServer":
+        self._server.output = open(self._filename, "ab")
+        self._thread.start()
+        return self
+
+    def __exit__(self, _type: object, _value: object, _traceback: object) -> None:
+        self._server.shutdown()
+
+        # Connections the system accepted, but serve_forever did not get to
+        # before it stopped, still carry print jobs
+        while select.select([self._server], [], [], 0)[0]:
+            self._server.handle_request()
+
+        self._server.server_close()
+        with self._server.lock:
+            if self._server.output is not None:
+                self._server.output.close()
+                self._server.output = None